@@ -0,0 +1,62 @@
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import numpy as np
+from common import SAGEMAKER_DIR
+
+# Executado em um processo novo, como na inicialização do container: importa o
+# inference.py, carrega o modelo e responde uma primeira requisição de uma linha
+COLD_START = '''
+import time
+start = time.perf_counter()
+from inference import model_fn, input_fn, predict_fn
+loaded = time.perf_counter()
+model = model_fn({model_dir!r})
+ready = time.perf_counter()
+predict_fn(input_fn({body!r}, 'application/json'), model)
+done = time.perf_counter()
+print(loaded - start, ready - loaded, done - ready)
+'''
+
+# Arquivos de cada formato de artefato
+ARTIFACTS = {
+    'joblib': ['model.joblib', 'preprocessor.joblib'],
+    'nativo': ['model.ubj', 'preprocessor.json'],
+}
+
+
+def cold_start(model_dir, body, repeat):
+    """Mediana (import, model_fn, primeira predição) em segundos, em processos novos"""
+    script = COLD_START.format(model_dir=model_dir, body=body)
+    timings = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', script], cwd=SAGEMAKER_DIR, check=True,
+                                capture_output=True, text=True).stdout
+        timings.append([float(value) for value in output.split()])
+    return np.median(timings, axis=0)
+
+
+if __name__ == '__main__':
+    # Compara o cold start com os artefatos em pickle (joblib) e nos formatos nativos
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--model-dir', type=str, required=True)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    from common import load_dataset, make_payload
+
+    body = make_payload(load_dataset(), 1).to_json(orient='records')
+
+    print('{:>8} {:>12} {:>14} {:>20} {:>10}'.format(
+        'formato', 'import (s)', 'model_fn (s)', '1ª predição (s)', 'total (s)'))
+    for name, files in ARTIFACTS.items():
+        # Cada formato em um diretório próprio, para que model_fn não encontre o outro
+        with tempfile.TemporaryDirectory() as model_dir:
+            for file in files:
+                shutil.copy(os.path.join(args.model_dir, file), model_dir)
+            import_time, load_time, predict_time = cold_start(model_dir, body, args.repeat)
+        print('{:>8} {:>12.3f} {:>14.3f} {:>20.3f} {:>10.3f}'.format(
+            name, import_time, load_time, predict_time, import_time + load_time + predict_time))
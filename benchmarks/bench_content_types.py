@@ -0,0 +1,53 @@
+import argparse
+from io import BytesIO
+import numpy as np
+import pyarrow as pa
+from common import load_dataset, make_payload, train_model, measure
+
+import inference
+
+
+def encode_request(payload, content_type, preprocessor):
+    """Serializa o payload como o cliente enviaria em cada content type"""
+    if content_type == 'application/json':
+        return payload.to_json(orient='records')
+    elif content_type == 'text/csv':
+        return payload.to_csv(index=False)
+    elif content_type == inference.ARROW_CONTENT_TYPE:
+        table = pa.Table.from_pandas(payload, preserve_index=False)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+    elif content_type == inference.NPY_CONTENT_TYPE:
+        buffer = BytesIO()
+        np.save(buffer, preprocessor.transform_array(payload))
+        return buffer.getvalue()
+
+
+if __name__ == '__main__':
+    # Custo de leitura (input_fn) e serialização (output_fn) para cada content type
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 100, 10000])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    df = load_dataset()
+    model_and_preprocessor = train_model(df)
+    content_types = ['application/json', 'text/csv', inference.ARROW_CONTENT_TYPE, inference.NPY_CONTENT_TYPE]
+
+    print('{:>8} {:>38} {:>12} {:>14} {:>14} {:>14}'.format(
+        'linhas', 'content type', 'corpo (KB)', 'input_fn (ms)', 'output_fn (ms)', 'resposta (KB)'))
+    for n_rows in args.sizes:
+        payload = make_payload(df, n_rows)
+        prediction = inference.predict_fn(payload, model_and_preprocessor, output='probability')
+        for content_type in content_types:
+            body = encode_request(payload, content_type, model_and_preprocessor[1])
+            # output_fn não tem saída CSV; nesse caso a resposta é medida em JSON
+            accept = 'application/json' if content_type == 'text/csv' else content_type
+            parse_time, _ = measure(lambda: inference.input_fn(body, content_type), repeat=args.repeat)
+            serialize_time, _ = measure(lambda: inference.output_fn(prediction, accept), repeat=args.repeat)
+            response = inference.output_fn(prediction, accept)
+            print('{:>8} {:>38} {:>12.1f} {:>14.3f} {:>14.3f} {:>14.1f}'.format(
+                n_rows, content_type, len(body) / 1024, parse_time * 1000, serialize_time * 1000,
+                len(response) / 1024))
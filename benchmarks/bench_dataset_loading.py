@@ -0,0 +1,49 @@
+import argparse
+import os
+import shutil
+import tempfile
+import time
+import pandas as pd
+from common import DATASET_PATH
+
+from data_loading import load_dataset
+
+
+def raw_load(path):
+    """Caminho anterior: parse do CSV em texto + to_numeric a cada execução"""
+    df = pd.read_csv(path)
+    df['TotalCharges'] = pd.to_numeric(df['TotalCharges'], errors='coerce')
+    return df
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+if __name__ == '__main__':
+    # Tempo de carga e memória do DataFrame: CSV bruto vs cache colunar (Parquet)
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scale', type=int, default=100)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    try:
+        # Cópia ampliada do CSV original
+        csv_path = os.path.join(workdir, 'telco_x{}.csv'.format(args.scale))
+        source = pd.read_csv(DATASET_PATH)
+        pd.concat([source] * args.scale, ignore_index=True).to_csv(csv_path, index=False)
+        cache_dir = os.path.join(workdir, 'cache')
+
+        raw_time, raw_df = timed(lambda: raw_load(csv_path))
+        build_time, _ = timed(lambda: load_dataset(csv_path, cache_dir=cache_dir))
+        cached_time, cached_df = timed(lambda: load_dataset(csv_path, cache_dir=cache_dir))
+
+        print('Linhas: {} | CSV: {:.1f} MB'.format(len(raw_df), os.path.getsize(csv_path) / 2**20))
+        print('{:>26} {:>10} {:>14}'.format('caminho', 'tempo (s)', 'memória (MB)'))
+        print('{:>26} {:>10.2f} {:>14.1f}'.format('CSV bruto', raw_time, raw_df.memory_usage(deep=True).sum() / 2**20))
+        print('{:>26} {:>10.2f} {:>14}'.format('cache (primeira execução)', build_time, '-'))
+        print('{:>26} {:>10.2f} {:>14.1f}'.format('cache Parquet', cached_time, cached_df.memory_usage(deep=True).sum() / 2**20))
+    finally:
+        shutil.rmtree(workdir)
@@ -0,0 +1,23 @@
+import argparse
+from common import load_dataset, make_payload, train_model, measure
+
+import inference
+
+if __name__ == '__main__':
+    # Compara o caminho 'dataframe' com o caminho 'numpy' de inference.predict_fn
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 100, 10000])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    df = load_dataset()
+    model_and_preprocessor = train_model(df)
+
+    print('{:>8} {:>10} {:>14} {:>16}'.format('linhas', 'modo', 'latência (ms)', 'pico alocado (KB)'))
+    for n_rows in args.sizes:
+        payload = make_payload(df, n_rows)
+        for mode in ('dataframe', 'numpy'):
+            latency, peak = measure(
+                lambda: inference.predict_fn(payload, model_and_preprocessor, mode=mode),
+                repeat=args.repeat)
+            print('{:>8} {:>10} {:>14.3f} {:>16.1f}'.format(n_rows, mode, latency * 1000, peak / 1024))
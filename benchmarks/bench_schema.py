@@ -0,0 +1,61 @@
+import argparse
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+import pandas as pd
+from common import DATASET_PATH
+
+from data_loading import read_csv
+from preprocessing import TelcoPreprocessor
+
+
+def raw_read_csv(path):
+    """Tipos padrão do pandas: texto como object/str, numéricas em 64 bits"""
+    df = pd.read_csv(path)
+    df['TotalCharges'] = pd.to_numeric(df['TotalCharges'], errors='coerce')
+    return df
+
+
+def profile(fn):
+    """Retorna (tempo em segundos, pico alocado em bytes, resultado)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    # Memória e tempo de groupby/codificação: tipos padrão vs SCHEMA compacto
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scale', type=int, default=100)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    try:
+        csv_path = os.path.join(workdir, 'telco_x{}.csv'.format(args.scale))
+        source = pd.read_csv(DATASET_PATH)
+        pd.concat([source] * args.scale, ignore_index=True).to_csv(csv_path, index=False)
+
+        print('{:>10} {:>14} {:>16} {:>12} {:>12} {:>14}'.format(
+            'tipos', 'leitura (s)', 'pico leitura (MB)', 'frame (MB)', 'groupby (s)', 'codificação (s)'))
+        for name, reader in (('padrão', raw_read_csv), ('schema', read_csv)):
+            read_time, peak, df = profile(lambda: reader(csv_path))
+            groupby_time = timed(lambda: [df.groupby(col, observed=True)['Churn'].value_counts(normalize=True)
+                                          for col in ('gender', 'Contract', 'PaymentMethod', 'InternetService')])
+            preprocessor = TelcoPreprocessor().fit(df)
+            encode_time = timed(lambda: preprocessor.transform_array(df))
+            print('{:>10} {:>14.2f} {:>16.1f} {:>12.1f} {:>12.3f} {:>14.3f}'.format(
+                name, read_time, peak / 2**20, df.memory_usage(deep=True).sum() / 2**20, groupby_time, encode_time))
+    finally:
+        shutil.rmtree(workdir)
@@ -0,0 +1,48 @@
+import argparse
+import time
+import tracemalloc
+import xgboost as xgb
+from common import load_dataset, scale_dataset
+
+from preprocessing import TelcoPreprocessor
+
+
+def matrix_nbytes(X):
+    """Memória ocupada pela matriz de features (densa ou CSR)"""
+    if hasattr(X, 'indptr'):
+        return X.data.nbytes + X.indices.nbytes + X.indptr.nbytes
+    return X.nbytes
+
+
+if __name__ == '__main__':
+    # Compara a codificação densa com a esparsa (CSR) em uma cópia ampliada do dataset
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scale', type=int, default=100)
+    parser.add_argument('--n_estimators', type=int, default=20)
+    args = parser.parse_args()
+
+    df = scale_dataset(load_dataset(), args.scale)
+    y = df['Churn']
+    print('Linhas: {}'.format(len(df)))
+
+    print('{:>8} {:>14} {:>18} {:>12} {:>14}'.format(
+        'formato', 'matriz (MB)', 'pico transform (MB)', 'fit (s)', 'predict (s)'))
+    for sparse in (False, True):
+        preprocessor = TelcoPreprocessor(sparse=sparse).fit(df)
+
+        tracemalloc.start()
+        X = preprocessor.transform_array(df)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        model = xgb.XGBClassifier(n_estimators=args.n_estimators, max_depth=5, eval_metric='logloss')
+        start = time.perf_counter()
+        model.fit(X, y)
+        fit_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        model.get_booster().inplace_predict(X)
+        predict_time = time.perf_counter() - start
+
+        print('{:>8} {:>14.1f} {:>18.1f} {:>12.2f} {:>14.2f}'.format(
+            'csr' if sparse else 'densa', matrix_nbytes(X) / 2**20, peak / 2**20, fit_time, predict_time))
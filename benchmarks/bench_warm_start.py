@@ -0,0 +1,64 @@
+import argparse
+import time
+import pandas as pd
+import xgboost as xgb
+from sklearn.metrics import accuracy_score, roc_auc_score
+from sklearn.model_selection import train_test_split
+from common import load_dataset, scale_dataset
+
+from preprocessing import TelcoPreprocessor
+
+
+def fit(preprocessor, df, n_estimators, base_model=None):
+    """Treina como o train.py (continuando base_model, se houver) e retorna (modelo, segundos)"""
+    X = preprocessor.transform(df)
+    model = xgb.XGBClassifier(n_estimators=n_estimators, max_depth=5, learning_rate=0.1, eval_metric='logloss')
+    start = time.perf_counter()
+    model.fit(X, df['Churn'], xgb_model=base_model.get_booster() if base_model is not None else None)
+    return model, time.perf_counter() - start
+
+
+def evaluate(model, preprocessor, df):
+    """(acurácia, AUC) no conjunto separado"""
+    probabilities = model.get_booster().inplace_predict(preprocessor.transform_array(df))
+    return accuracy_score(df['Churn'], probabilities > 0.5), roc_auc_score(df['Churn'], probabilities)
+
+
+if __name__ == '__main__':
+    # Compara o treino incremental (delta mensal sobre o modelo anterior) com o retreino completo
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scale', type=int, default=10)
+    parser.add_argument('--delta', type=float, default=0.1)
+    parser.add_argument('--base-rounds', type=int, default=100)
+    parser.add_argument('--extra-rounds', type=int, default=20)
+    args = parser.parse_args()
+
+    df = load_dataset()
+    train, holdout = train_test_split(df, test_size=0.2, stratify=df['Churn'], random_state=42)
+    base, delta = train_test_split(scale_dataset(train, args.scale), test_size=args.delta, random_state=42)
+    print('Base: {} linhas, delta: {} linhas, validação: {} linhas'.format(len(base), len(delta), len(holdout)))
+
+    # Modelo do mês anterior
+    base_preprocessor = TelcoPreprocessor().fit(base)
+    base_model, base_time = fit(base_preprocessor, base, args.base_rounds)
+
+    # Incremental: vocabulário salvo, apenas o delta e as árvores adicionais
+    print('Categorias fora do vocabulário no delta: {}'.format(base_preprocessor.unseen_categories(delta) or 'nenhuma'))
+    warm_model, warm_time = fit(base_preprocessor, delta, args.extra_rounds, base_model=base_model)
+
+    # Retreino completo: base + delta, do zero, com o mesmo número total de árvores
+    full = pd.concat([base, delta], ignore_index=True)
+    full_preprocessor = TelcoPreprocessor().fit(full)
+    full_model, full_time = fit(full_preprocessor, full, args.base_rounds + args.extra_rounds)
+
+    print('{:>14} {:>10} {:>10} {:>8}'.format('treino', 'tempo (s)', 'acurácia', 'AUC'))
+    for name, model, preprocessor, elapsed in (('anterior', base_model, base_preprocessor, base_time),
+                                               ('incremental', warm_model, base_preprocessor, warm_time),
+                                               ('completo', full_model, full_preprocessor, full_time)):
+        accuracy, auc = evaluate(model, preprocessor, holdout)
+        print('{:>14} {:>10.2f} {:>10.4f} {:>8.4f}'.format(name, elapsed, accuracy, auc))
+
+    warm_accuracy, _ = evaluate(warm_model, base_preprocessor, holdout)
+    full_accuracy, _ = evaluate(full_model, full_preprocessor, holdout)
+    print('Incremental: {:.1f}x mais rápido, diferença de acurácia {:+.4f}'.format(
+        full_time / warm_time, warm_accuracy - full_accuracy))
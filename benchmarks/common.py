@@ -0,0 +1,62 @@
+import os
+import sys
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+
+# Caminhos do repositório; os módulos de sagemaker/ são importados diretamente pelos benchmarks
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAGEMAKER_DIR = os.path.join(ROOT_DIR, 'sagemaker')
+DATASET_PATH = os.path.join(ROOT_DIR, 'env', 'dataset', 'WA_Fn-UseC_-Telco-Customer-Churn.csv')
+
+if SAGEMAKER_DIR not in sys.path:
+    sys.path.insert(0, SAGEMAKER_DIR)
+
+
+def load_dataset(path=DATASET_PATH):
+    """Carrega o dataset no mesmo formato do train.csv (sem 'customerID', 'Churn' em 0/1)"""
+    df = pd.read_csv(path)
+    df = df.drop(columns=['customerID'])
+    df['Churn'] = df['Churn'].map({'Yes': 1, 'No': 0})
+    return df
+
+
+def scale_dataset(df, factor, seed=42):
+    """Cópia ampliada do dataset: factor vezes o número de linhas, amostradas com reposição"""
+    return df.sample(n=len(df) * factor, replace=True, random_state=seed).reset_index(drop=True)
+
+
+def make_payload(df, n_rows, seed=42):
+    """Amostra (com reposição) n_rows linhas sem a coluna alvo, como numa requisição"""
+    sample = df.sample(n=n_rows, replace=True, random_state=seed).reset_index(drop=True)
+    return sample.drop(columns=['Churn'])
+
+
+def train_model(df, n_estimators=100, max_depth=5, learning_rate=0.1):
+    """Treina o modelo como o sagemaker/train.py e retorna (model, preprocessor)"""
+    import xgboost as xgb
+    from preprocessing import TelcoPreprocessor
+
+    preprocessor = TelcoPreprocessor()
+    X = preprocessor.fit_transform(df)
+    model = xgb.XGBClassifier(n_estimators=n_estimators, max_depth=max_depth,
+                              learning_rate=learning_rate, eval_metric='logloss')
+    model.fit(X, df['Churn'])
+    return model, preprocessor
+
+
+def measure(fn, repeat=5):
+    """Executa fn repetidamente e retorna (mediana em segundos, pico de memória alocada em bytes)"""
+    fn()  # aquecimento
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return float(np.median(timings)), peak
@@ -0,0 +1,55 @@
+import argparse
+import http.client
+import threading
+import time
+import numpy as np
+from common import load_dataset, make_payload
+
+
+def client(host, port, body, content_type, deadline, latencies, errors):
+    """Envia requisições em sequência (conexão keep-alive) até o prazo final"""
+    connection = http.client.HTTPConnection(host, port)
+    headers = {'Content-Type': content_type, 'Accept': 'application/json'}
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        connection.request('POST', '/invocations', body=body, headers=headers)
+        response = connection.getresponse()
+        response.read()
+        if response.status == 200:
+            latencies.append(time.perf_counter() - start)
+        else:
+            errors.append(response.status)
+    connection.close()
+
+
+if __name__ == '__main__':
+    # Gerador de carga para o servidor local (sagemaker/serve.py): N clientes concorrentes
+    # enviando requisições pequenas; reporta p50/p99 de latência e vazão
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--host', type=str, default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--rows', type=int, default=1)
+    parser.add_argument('--duration', type=float, default=10.0)
+    args = parser.parse_args()
+
+    body = make_payload(load_dataset(), args.rows).to_csv(index=False).encode('utf-8')
+
+    latencies, errors = [], []
+    deadline = time.perf_counter() + args.duration
+    threads = [threading.Thread(target=client, args=(args.host, args.port, body, 'text/csv',
+                                                     deadline, latencies, errors))
+               for _ in range(args.clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies_ms = np.array(latencies) * 1000
+    print('Requisições: {} | Erros: {} | Vazão: {:.0f} req/s ({:.0f} linhas/s)'.format(
+        len(latencies), len(errors), len(latencies) / elapsed, len(latencies) * args.rows / elapsed))
+    if len(latencies_ms):
+        print('Latência p50: {:.2f} ms | p99: {:.2f} ms'.format(
+            np.percentile(latencies_ms, 50), np.percentile(latencies_ms, 99)))
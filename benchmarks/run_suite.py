@@ -0,0 +1,149 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from common import ROOT_DIR, measure
+from synthetic import write_synthetic
+
+# O cache colunar do data_loading vai para um diretório temporário, para medir a conversão do CSV
+os.environ.setdefault('TELCO_DATA_CACHE_DIR', tempfile.mkdtemp(prefix='telco_bench_'))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'streamlit'))
+
+import xgboost as xgb
+from data_loading import read_csv
+from preprocessing import TelcoPreprocessor, TARGET_COLUMN
+from inference import input_fn, predict_fn, output_fn
+
+
+def environment():
+    """Commit, data e versões, para comparar resultados entre execuções"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT_DIR, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {'commit': commit, 'date': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(), 'platform': platform.platform(), 'cpus': os.cpu_count(),
+            'numpy': np.__version__, 'pandas': pd.__version__, 'xgboost': xgb.__version__}
+
+
+def timed(fn):
+    """Tempo de uma única execução (etapas caras demais para repetir)"""
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def synthetic_files(data_dir, rows, seed):
+    """CSV sintético no formato original e no formato do train.csv, gerados apenas uma vez"""
+    raw_path = os.path.join(data_dir, 'telco_{}_{}.csv'.format(rows, seed))
+    train_path = os.path.join(data_dir, 'train_{}_{}.csv'.format(rows, seed))
+    if not os.path.exists(raw_path):
+        write_synthetic(raw_path, rows, seed=seed)
+    if not os.path.exists(train_path):
+        write_synthetic(train_path, rows, seed=seed, train_format=True)
+    return raw_path, train_path
+
+
+def bench_training(results, train_path, rows, n_estimators):
+    """Leitura do train.csv, pré-processamento e fit, como no train.py"""
+    seconds, df = timed(lambda: read_csv(train_path))
+    results.append({'benchmark': 'train.read_csv', 'rows': rows, 'seconds': seconds})
+
+    preprocessor = TelcoPreprocessor()
+    seconds, X = timed(lambda: preprocessor.fit_transform(df))
+    results.append({'benchmark': 'train.preprocess', 'rows': rows, 'seconds': seconds})
+
+    model = xgb.XGBClassifier(n_estimators=n_estimators, max_depth=5, learning_rate=0.1, eval_metric='logloss')
+    seconds, _ = timed(lambda: model.fit(X, df[TARGET_COLUMN]))
+    results.append({'benchmark': 'train.fit', 'rows': rows, 'seconds': seconds, 'n_estimators': n_estimators})
+    return model, preprocessor
+
+
+def bench_inference(results, raw_path, rows, model_and_preprocessor, payload_sizes, repeat):
+    """input_fn, predict_fn e output_fn por tamanho de payload e formato de entrada"""
+    for payload_rows in payload_sizes:
+        payload = pd.read_csv(raw_path, nrows=payload_rows).drop(columns=[TARGET_COLUMN])
+        for content_type, body in (('text/csv', payload.to_csv(index=False)),
+                                   ('application/json', payload.to_json(orient='records'))):
+            data = input_fn(body, content_type)
+            prediction = predict_fn(data, model_and_preprocessor)
+            for stage, fn in (('inference.input_fn', lambda: input_fn(body, content_type)),
+                              ('inference.predict_fn', lambda: predict_fn(data, model_and_preprocessor)),
+                              ('inference.output_fn', lambda: output_fn(prediction, 'application/json'))):
+                seconds, peak = measure(fn, repeat=repeat)
+                results.append({'benchmark': stage, 'rows': rows, 'payload_rows': payload_rows,
+                                'content_type': content_type, 'payload_bytes': len(body),
+                                'seconds': seconds, 'peak_bytes': peak})
+
+
+def bench_eda(results, raw_path, rows):
+    """eda_dataset.load_data: primeira carga (conversão para Parquet) e recarga a partir do Parquet"""
+    import eda_dataset
+
+    eda_dataset.DATASET_PATH = raw_path
+    eda_dataset._load_data.clear()
+    seconds, _ = timed(eda_dataset.load_data)
+    results.append({'benchmark': 'eda.load_data.cold', 'rows': rows, 'seconds': seconds})
+
+    eda_dataset._load_data.clear()
+    seconds, _ = timed(eda_dataset.load_data)
+    results.append({'benchmark': 'eda.load_data.parquet', 'rows': rows, 'seconds': seconds})
+
+
+def compare(results, baseline_path):
+    """Razão entre os tempos atuais e os de um resultado anterior, para as mesmas medições"""
+    def key(result):
+        return result['benchmark'], result['rows'], result.get('payload_rows'), result.get('content_type')
+
+    with open(baseline_path) as source:
+        baseline = {key(result): result['seconds'] for result in json.load(source)['results']}
+    for result in results:
+        if key(result) in baseline and baseline[key(result)] > 0:
+            print('{:>24} {:>10} {:>8} {:>18} {:>8.2f}x'.format(
+                result['benchmark'], result['rows'], result.get('payload_rows', ''),
+                result.get('content_type', ''), result['seconds'] / baseline[key(result)]))
+
+
+if __name__ == '__main__':
+    # Suíte de benchmarks sobre dados sintéticos em várias escalas; os resultados vão para
+    # um JSON (ambiente + uma entrada por medição) que pode ser comparado entre commits
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=float, nargs='+', default=[1e5, 1e6])
+    parser.add_argument('--payload-rows', type=int, nargs='+', default=[1, 100, 10000])
+    parser.add_argument('--n_estimators', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--data-dir', type=str, default=tempfile.gettempdir())
+    parser.add_argument('--output', type=str, default='benchmark_results.json')
+    # Resultado anterior (outro commit) para comparação: razão > 1 indica regressão
+    parser.add_argument('--baseline', type=str, default=None)
+    args = parser.parse_args()
+
+    results = []
+    for rows in map(int, args.sizes):
+        raw_path, train_path = synthetic_files(args.data_dir, rows, args.seed)
+        model_and_preprocessor = bench_training(results, train_path, rows, args.n_estimators)
+        bench_inference(results, raw_path, rows, model_and_preprocessor,
+                        [n for n in args.payload_rows if n <= rows], args.repeat)
+        bench_eda(results, raw_path, rows)
+
+        for result in results:
+            if result['rows'] == rows:
+                print('{:>24} {:>10} {:>8} {:>18} {:>10.4f}s'.format(
+                    result['benchmark'], rows, result.get('payload_rows', ''), result.get('content_type', ''),
+                    result['seconds']))
+
+    with open(args.output, 'w') as target:
+        json.dump({'environment': environment(), 'results': results}, target, indent=2)
+    print('Resultados gravados em {}'.format(args.output))
+
+    if args.baseline:
+        compare(results, args.baseline)
@@ -0,0 +1,65 @@
+import argparse
+import numpy as np
+import pandas as pd
+from common import DATASET_PATH
+
+from preprocessing import CATEGORICAL_COLUMNS
+
+
+def iter_synthetic(n_rows, seed=42, chunk_size=1000000, source_path=DATASET_PATH):
+    """Gera linhas sintéticas do Telco em blocos, no formato do CSV original
+
+    Cada linha parte de um cliente real sorteado: as colunas categóricas, o
+    SeniorCitizen e o Churn são copiados dele (preservando as distribuições de cada
+    coluna e as dependências entre serviços), enquanto 'tenure' e 'MonthlyCharges'
+    recebem ruído e 'TotalCharges' é recalculada como tenure x MonthlyCharges, o que
+    mantém a correlação entre permanência e cobranças sem repetir linhas reais.
+    """
+    source = pd.read_csv(source_path)
+    rng = np.random.default_rng(seed)
+
+    for start in range(0, n_rows, chunk_size):
+        size = min(chunk_size, n_rows - start)
+        rows = source.iloc[rng.integers(0, len(source), size)].reset_index(drop=True)
+
+        chunk = pd.DataFrame({'customerID': ['{:010d}-SYNT'.format(i) for i in range(start, start + size)]})
+        for col in CATEGORICAL_COLUMNS + ['SeniorCitizen', 'Churn']:
+            chunk[col] = rows[col].to_numpy()
+
+        # Só os clientes novos do dataset real continuam com tenure 0
+        source_tenure = rows['tenure'].to_numpy()
+        tenure = np.where(source_tenure == 0, 0, np.clip(source_tenure + rng.integers(-3, 4, size), 1, 72))
+        monthly = np.clip(rows['MonthlyCharges'].to_numpy() + rng.normal(0, 2, size), 18.25, 118.75).round(2)
+        total = (np.maximum(tenure, 1) * monthly * rng.lognormal(0, 0.05, size)).round(2)
+        chunk['tenure'] = tenure
+        chunk['MonthlyCharges'] = monthly
+        # Como no dataset real, clientes novos (tenure 0) têm 'TotalCharges' em branco
+        chunk['TotalCharges'] = np.where(tenure == 0, ' ', total.astype(str))
+        yield chunk[source.columns]
+
+
+def write_synthetic(path, n_rows, seed=42, chunk_size=1000000, train_format=False):
+    """Grava n_rows linhas sintéticas em CSV, bloco a bloco (memória limitada a um bloco)
+
+    Com train_format=True o arquivo segue o train.csv do SageMaker: sem 'customerID'
+    e com 'Churn' em 0/1.
+    """
+    for i, chunk in enumerate(iter_synthetic(n_rows, seed=seed, chunk_size=chunk_size)):
+        if train_format:
+            chunk = chunk.drop(columns=['customerID'])
+            chunk['Churn'] = chunk['Churn'].map({'Yes': 1, 'No': 0})
+        chunk.to_csv(path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+
+
+if __name__ == '__main__':
+    # Gera um CSV sintético do Telco com qualquer número de linhas (ex.: 1e5 a 1e8)
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=float, required=True)
+    parser.add_argument('--output', type=str, required=True)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--chunk-size', type=int, default=1000000)
+    parser.add_argument('--train-format', action='store_true')
+    args = parser.parse_args()
+
+    write_synthetic(args.output, int(args.rows), seed=args.seed, chunk_size=args.chunk_size,
+                    train_format=args.train_format)
@@ -1,11 +1,15 @@
 import argparse
 import os
-import pandas as pd
+import sys
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score
 import xgboost as xgb
 import joblib
 
+# Carregamento compartilhado (cache colunar) do diretório sagemaker/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'sagemaker'))
+from data_loading import load_dataset
+
 # Função para carregar o modelo treinado no SageMaker
 def model_fn(model_dir):
     """Carregar o modelo treinado"""
@@ -31,11 +35,11 @@ if __name__ == '__main__':
 
     # Carregar os dados de treinamento do S3
     dataset_path = os.path.join(args.train, "WA_Fn-UseC_-Telco-Customer-Churn.csv")
-    df = pd.read_csv(dataset_path)
+    df = load_dataset(dataset_path)
 
     # Pré-processamento básico
     # Converter a variável de resposta 'Churn' para 0 e 1
-    df['Churn'] = df['Churn'].map({'Yes': 1, 'No': 0})
+    df['Churn'] = df['Churn'].map({'Yes': 1, 'No': 0}).astype(int)
 
     # Separar as features (X) da variável alvo (y)
     X = df.drop('Churn', axis=1)
@@ -0,0 +1,156 @@
+import argparse
+import itertools
+import multiprocessing
+import resource
+import time
+from collections import deque
+import numpy as np
+import pandas as pd
+
+from inference import model_fn, input_fn, predict_fn, resolve_top_k, top_k_indices
+
+# Modelo, formato de entrada e opções de predict_fn do processo atual (carregados uma única vez por worker)
+_model_and_preprocessor = None
+_content_type = None
+_predict_kwargs = {}
+
+
+def _init_worker(model_dir, content_type, predict_kwargs, n_jobs=None):
+    """Carrega o modelo e o pré-processamento no processo atual"""
+    global _model_and_preprocessor, _content_type, _predict_kwargs
+    _model_and_preprocessor = model_fn(model_dir)
+    _content_type = content_type
+    _predict_kwargs = predict_kwargs
+    if n_jobs is not None:
+        # Limitar as threads do XGBoost para não disputar núcleos entre workers
+        _model_and_preprocessor[0].set_params(n_jobs=n_jobs)
+
+
+def score_chunk(body):
+    """Aplica input_fn -> predict_fn em um bloco de texto e retorna (linhas do bloco, resultado)"""
+    data = input_fn(body, _content_type)
+    return len(data), predict_fn(data, _model_and_preprocessor, **_predict_kwargs)
+
+
+def iter_chunks(path, content_type, chunk_size):
+    """Lê o arquivo em blocos de chunk_size linhas, repetindo o cabeçalho do CSV em cada bloco
+
+    Assume um registro por linha (sem quebras de linha dentro de campos), como no
+    split_type='Line' do batch transform do SageMaker.
+    """
+    with open(path) as source:
+        header = source.readline() if content_type == 'text/csv' else ''
+        while True:
+            lines = list(itertools.islice(source, chunk_size))
+            if not lines:
+                break
+            yield header + ''.join(lines)
+
+
+def count_rows(path, content_type, block_size=1 << 20):
+    """Conta os registros do arquivo (uma linha cada, sem o cabeçalho do CSV) lendo blocos de bytes"""
+    n_lines = 0
+    last = b'\n'
+    with open(path, 'rb') as source:
+        for block in iter(lambda: source.read(block_size), b''):
+            n_lines += block.count(b'\n')
+            last = block[-1:]
+    # A última linha pode não terminar em quebra de linha
+    n_lines += last != b'\n'
+    return n_lines - 1 if content_type == 'text/csv' and n_lines > 0 else n_lines
+
+
+class ResultWriter:
+    """Grava os resultados de cada bloco em CSV, na ordem da entrada
+
+    Com top_k, mantém apenas os k clientes de maior probabilidade vistos até o
+    momento (memória limitada a k linhas) e grava o ranking ao final.
+    """
+
+    def __init__(self, output, top_k=None):
+        self.output = output
+        self.top_k = top_k
+        self.n_rows = 0
+        self.candidates = None
+
+    def add(self, n_rows, result):
+        if 'index' in result:
+            # Posição relativa ao bloco -> posição no arquivo
+            result = dict(result, index=result['index'] + self.n_rows)
+
+        if self.top_k is None:
+            pd.DataFrame(result).to_csv(self.output, header=self.n_rows == 0, index=False)
+        elif self.candidates is None:
+            self.candidates = result
+        else:
+            merged = {name: np.concatenate([self.candidates[name], values]) for name, values in result.items()}
+            selected = top_k_indices(merged['probabilities'], self.top_k)
+            self.candidates = {name: values[selected] for name, values in merged.items()}
+        self.n_rows += n_rows
+
+    def close(self):
+        if self.top_k is not None and self.candidates is not None:
+            pd.DataFrame(self.candidates).to_csv(self.output, index=False)
+
+
+# Escoamento offline em blocos: lê o arquivo de entrada em partes de tamanho fixo,
+# aplica a mesma lógica input_fn -> predict_fn do endpoint e grava as predições a cada
+# bloco, mantendo a memória limitada ao tamanho do bloco independentemente do tamanho
+# do arquivo. Com --workers > 1 os blocos são distribuídos entre processos e as
+# predições são gravadas na ordem original.
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--model-dir', type=str, required=True)
+    parser.add_argument('--input', type=str, required=True)
+    parser.add_argument('--output', type=str, required=True)
+    parser.add_argument('--content-type', type=str, default='text/csv',
+                        choices=['text/csv', 'application/jsonlines'])
+    parser.add_argument('--chunk-size', type=int, default=10000)
+    parser.add_argument('--workers', type=int, default=1)
+
+    # Saída: rótulos 0/1 ou probabilidades de churn; --top-k grava apenas os clientes de maior
+    # risco: um número (ex.: 500) ou uma fração do arquivo inteiro (ex.: 0.01 = top 1%)
+    parser.add_argument('--output-type', type=str, default='label', choices=['label', 'probability'])
+    parser.add_argument('--top-k', type=float, default=None)
+    # Principais motivos (contribuições SHAP) de cada cliente gravado; com --top-k, só dos selecionados
+    parser.add_argument('--reasons', type=int, default=0)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    top_k = args.top_k
+    if top_k is not None:
+        # Uma fração é relativa ao arquivo inteiro, não a cada bloco: as linhas são contadas
+        # antes (uma passada só de leitura) e a fração vira um k absoluto
+        top_k = resolve_top_k(top_k, count_rows(args.input, args.content_type) if 0 < top_k < 1 else 0)
+
+    chunks = iter_chunks(args.input, args.content_type, args.chunk_size)
+    predict_kwargs = {'output': args.output_type, 'top_k': top_k, 'reasons': args.reasons}
+
+    with open(args.output, 'w') as output:
+        writer = ResultWriter(output, top_k=top_k)
+
+        if args.workers <= 1:
+            _init_worker(args.model_dir, args.content_type, predict_kwargs)
+            for body in chunks:
+                writer.add(*score_chunk(body))
+        else:
+            with multiprocessing.Pool(args.workers, initializer=_init_worker,
+                                      initargs=(args.model_dir, args.content_type, predict_kwargs, 1)) as pool:
+                # Janela limitada de blocos em processamento para manter a memória sob controle
+                pending = deque()
+                for body in chunks:
+                    pending.append(pool.apply_async(score_chunk, (body,)))
+                    if len(pending) >= 2 * args.workers:
+                        writer.add(*pending.popleft().get())
+                while pending:
+                    writer.add(*pending.popleft().get())
+
+        writer.close()
+    elapsed = time.perf_counter() - start
+    n_rows = writer.n_rows
+
+    # ru_maxrss é reportado em KB no Linux; inclui os workers já finalizados
+    peak_rss = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                   resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss) / 1024
+    print('Linhas: {} | Workers: {} | Tempo: {:.2f}s | Vazão: {:.0f} linhas/s | Pico de RSS: {:.1f} MB'.format(
+        n_rows, max(args.workers, 1), elapsed, n_rows / elapsed if elapsed > 0 else 0.0, peak_rss))
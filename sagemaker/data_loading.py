@@ -0,0 +1,64 @@
+import hashlib
+import os
+import pandas as pd
+
+from preprocessing import CSV_DTYPES, apply_schema
+
+# Diretório padrão do cache colunar (pode ser trocado pela variável de ambiente)
+CACHE_DIR = os.environ.get('TELCO_DATA_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'telco_churn'))
+
+# Colunas de texto que não são categóricas
+TEXT_COLUMNS = ['customerID']
+
+# Versão do formato do cache; mudanças de tipos invalidam os caches gravados anteriormente
+CACHE_VERSION = 2
+
+
+def file_hash(path, block_size=1 << 20):
+    """Hash (BLAKE2b) do conteúdo do arquivo, lido em blocos"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as source:
+        for block in iter(lambda: source.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_csv(path):
+    """Lê o CSV do Telco já com os tipos compactos do SCHEMA
+
+    'TotalCharges' vira numérica (valores em branco ficam NaN) e as demais colunas
+    de texto de baixa cardinalidade (como 'Churn' em Yes/No) viram 'category'.
+    """
+    df = apply_schema(pd.read_csv(path, dtype=CSV_DTYPES))
+    for col in df.columns:
+        if col not in TEXT_COLUMNS and not pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = df[col].astype('category')
+    return df
+
+
+def load_dataset(path, cache_dir=None):
+    """Carrega o CSV a partir de um cache Parquet, convertendo-o apenas uma vez
+
+    O cache é identificado pelo hash do arquivo de origem: qualquer alteração no CSV
+    gera um novo cache. As colunas categóricas são gravadas com dicionário (Parquet
+    dictionary encoding) e voltam como 'category'. Sem pyarrow, lê o CSV diretamente.
+    """
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return read_csv(path)
+
+    cache_dir = cache_dir or CACHE_DIR
+    name = os.path.splitext(os.path.basename(path))[0]
+    cache_path = os.path.join(cache_dir, '{}.{}.v{}.parquet'.format(name, file_hash(path), CACHE_VERSION))
+
+    if os.path.exists(cache_path):
+        return pd.read_parquet(cache_path)
+
+    df = read_csv(path)
+    os.makedirs(cache_dir, exist_ok=True)
+    # Grava em arquivo temporário e renomeia, para que leitores concorrentes nunca vejam um cache parcial
+    tmp_path = '{}.{}.tmp'.format(cache_path, os.getpid())
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, cache_path)
+    return df
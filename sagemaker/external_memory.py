@@ -0,0 +1,88 @@
+import os
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+from preprocessing import CSV_DTYPES, CATEGORICAL_COLUMNS, TARGET_COLUMN, TelcoPreprocessor, apply_schema
+
+# Tamanho máximo da amostra de 'TotalCharges' usada para estimar a mediana (12 bytes por valor)
+MEDIAN_SAMPLE_SIZE = 100000
+
+
+def iter_csv_chunks(path, chunk_size):
+    """Lê o CSV em blocos de chunk_size linhas, já com os tipos do SCHEMA"""
+    for chunk in pd.read_csv(path, dtype=CSV_DTYPES, chunksize=chunk_size):
+        yield apply_schema(chunk)
+
+
+def fit_preprocessor(path, chunk_size, sparse=False, categorical=False,
+                     median_sample_size=MEDIAN_SAMPLE_SIZE, seed=42):
+    """Ajusta o TelcoPreprocessor em uma passada pelo CSV, sem carregá-lo inteiro
+
+    Acumula o vocabulário de cada coluna categórica e uma amostra uniforme de até
+    median_sample_size valores de 'TotalCharges' (cada valor recebe uma chave aleatória
+    e ficam os de menores chaves), de modo que a memória não cresce com o arquivo. A
+    mediana é exata até esse número de linhas; acima dele é a mediana da amostra, com
+    erro de posição da ordem de 0.5 / sqrt(median_sample_size) (~0.16% com 100 mil).
+    """
+    rng = np.random.default_rng(seed)
+    categories = {col: set() for col in CATEGORICAL_COLUMNS}
+    sample_keys = np.empty(0)
+    sample = np.empty(0, dtype=np.float32)
+    for chunk in iter_csv_chunks(path, chunk_size):
+        for col in CATEGORICAL_COLUMNS:
+            categories[col].update(map(str, chunk[col].dropna().unique()))
+        values = chunk['TotalCharges'].to_numpy(dtype=np.float32)
+        values = values[~np.isnan(values)]
+        sample_keys = np.concatenate([sample_keys, rng.random(len(values))])
+        sample = np.concatenate([sample, values])
+        if len(sample) > median_sample_size:
+            kept = np.argpartition(sample_keys, median_sample_size - 1)[:median_sample_size]
+            sample_keys, sample = sample_keys[kept], sample[kept]
+
+    preprocessor = TelcoPreprocessor(sparse=sparse, categorical=categorical)
+    preprocessor.total_charges_median_ = float(np.median(sample)) if len(sample) else float('nan')
+    preprocessor.categories_ = {col: sorted(values) for col, values in categories.items()}
+    return preprocessor._build_tables()
+
+
+class ChunkIter(xgb.DataIter):
+    """Entrega o CSV ao XGBoost bloco a bloco, codificado pelo pré-processamento ajustado
+
+    O XGBoost percorre o iterador algumas vezes (reset/next) e guarda as páginas
+    já quantizadas em arquivos com o prefixo cache_prefix, de modo que apenas um
+    bloco de dados brutos fica em memória por vez.
+    """
+
+    def __init__(self, path, preprocessor, chunk_size, cache_prefix):
+        self.path = path
+        self.preprocessor = preprocessor
+        self.chunk_size = chunk_size
+        self._chunks = None
+        super().__init__(cache_prefix=cache_prefix)
+
+    def next(self, input_data):
+        if self._chunks is None:
+            self._chunks = iter_csv_chunks(self.path, self.chunk_size)
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            return False
+        # Matrizes densas e CSR recebem os nomes das features, para continuar modelos treinados com
+        # DataFrame (train.py em memória); no modo categórico o DataFrame já traz as colunas
+        features = self.preprocessor.transform_array(chunk)
+        feature_names = None if self.preprocessor.categorical else self.preprocessor.feature_names_
+        input_data(data=features, label=chunk[TARGET_COLUMN].to_numpy(), feature_names=feature_names)
+        return True
+
+    def reset(self):
+        self._chunks = None
+
+
+def train_external_memory(path, preprocessor, chunk_size, cache_dir, params, num_boost_round, xgb_model=None):
+    """Treina com o CSV em memória externa (continuando xgb_model, se houver) e retorna o Booster"""
+    it = ChunkIter(path, preprocessor, chunk_size, cache_prefix=os.path.join(cache_dir, 'telco'))
+    if hasattr(xgb, 'ExtMemQuantileDMatrix'):
+        dtrain = xgb.ExtMemQuantileDMatrix(it, enable_categorical=preprocessor.categorical)
+    else:
+        dtrain = xgb.DMatrix(it, enable_categorical=preprocessor.categorical)
+    return xgb.train(dict(params, tree_method='hist'), dtrain, num_boost_round=num_boost_round, xgb_model=xgb_model)
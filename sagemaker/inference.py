@@ -1,75 +1,330 @@
 import os
+import numpy as np
 import pandas as pd
-import joblib
 import json
-from sklearn.preprocessing import OneHotEncoder
+from preprocessing import NUMERIC_COLUMNS, CATEGORICAL_COLUMNS, TelcoPreprocessor
+import hashlib
+import time
+from io import BytesIO, StringIO
+import metrics
 
-# Função para carregar o modelo e o encoder treinado no SageMaker
+# Modo de predição: 'numpy' (padrão) envia a matriz float32 direto ao booster do XGBoost;
+# 'dataframe' mantém o caminho anterior via DataFrame e XGBClassifier.predict
+PREDICT_MODE = os.environ.get('TELCO_PREDICT_MODE', 'numpy')
+
+# Saída: 'label' (0/1, padrão) ou 'probability' (probabilidade de churn por cliente)
+OUTPUT = os.environ.get('TELCO_OUTPUT', 'label')
+
+# Ranking dos clientes de maior risco: inteiro (k clientes) ou fração do lote (ex.: 0.01 = top 1%)
+TOP_K = float(os.environ['TELCO_TOP_K']) if os.environ.get('TELCO_TOP_K') else None
+
+# Principais motivos (contribuições SHAP) por cliente: 0 = desativado; as contribuições são
+# calculadas em blocos de REASONS_BATCH_ROWS linhas para limitar a memória em lotes grandes
+REASONS = int(os.environ.get('TELCO_REASONS', '0'))
+REASONS_BATCH_ROWS = int(os.environ.get('TELCO_REASONS_BATCH_ROWS', '10000'))
+
+# Cache de predições por cliente (desativado com tamanho 0) e expiração das entradas em segundos
+CACHE_SIZE = int(os.environ.get('TELCO_CACHE_SIZE', '0'))
+CACHE_TTL = float(os.environ.get('TELCO_CACHE_TTL', '86400'))
+PREDICTION_CACHE = None
+
+# Formatos binários: Arrow IPC (colunar, dados brutos) e .npy (features já codificadas na entrada)
+ARROW_CONTENT_TYPE = 'application/vnd.apache.arrow.stream'
+NPY_CONTENT_TYPE = 'application/x-npy'
+
+# Função para carregar o modelo e o pré-processamento treinados no SageMaker
 def model_fn(model_dir):
-    """Carregar o modelo e o encoder treinado"""
-    model = joblib.load(os.path.join(model_dir, "model.joblib"))
-    encoder = joblib.load(os.path.join(model_dir, "encoder.joblib"))
-    return model, encoder
+    """Carregar o modelo e o pré-processamento ajustado no treino"""
+    global PREDICTION_CACHE
+    start = time.perf_counter()
+    model, preprocessor, model_path = load_artifacts(model_dir)
+    metrics.observe('model_load_seconds', time.perf_counter() - start)
 
-# Função para pré-processar os dados de entrada
+    if CACHE_SIZE > 0:
+        from prediction_cache import PredictionCache
+
+        # A versão do modelo (hash do artefato) faz parte da chave do cache
+        with open(model_path, 'rb') as artifact:
+            model_version = hashlib.sha1(artifact.read()).hexdigest()
+        PREDICTION_CACHE = PredictionCache(max_entries=CACHE_SIZE, ttl_seconds=CACHE_TTL,
+                                           model_version=model_version)
+    return model, preprocessor
+
+
+def load_artifacts(model_dir):
+    """Retorna (modelo, pré-processamento, caminho do modelo) gravados pelo train.py
+
+    Usa os formatos nativos (model.ubj e preprocessor.json) quando presentes, que
+    não dependem de unpickle nem da versão das bibliotecas; artefatos antigos, só
+    com os .joblib, continuam sendo aceitos.
+    """
+    model_path = os.path.join(model_dir, "model.ubj")
+    if os.path.exists(model_path):
+        import xgboost as xgb
+
+        model = xgb.XGBClassifier()
+        model.load_model(model_path)
+        preprocessor = TelcoPreprocessor.load(os.path.join(model_dir, "preprocessor.json"))
+    else:
+        import joblib
+
+        model_path = os.path.join(model_dir, "model.joblib")
+        model = joblib.load(model_path)
+        preprocessor = joblib.load(os.path.join(model_dir, "preprocessor.joblib"))
+    return model, preprocessor, model_path
+
+# Função para ler os dados de entrada
+@metrics.timed('input_fn')
 def input_fn(request_body, request_content_type='application/json'):
-    """Pré-processar os dados de entrada"""
-    if request_content_type == 'application/json':
-        data = pd.read_json(request_body, orient='records')
-    elif request_content_type == 'text/csv':
-        from io import StringIO
-        data = pd.read_csv(StringIO(request_body))
+    """Ler os dados de entrada
+
+    O pré-processamento depende das estatísticas de treino e por isso é aplicado
+    em predict_fn, pelo TelcoPreprocessor carregado em model_fn. Os formatos
+    binários recebem o corpo em bytes. As colunas ficam com os tipos da leitura:
+    o SCHEMA compacto é só dos carregamentos em massa, já que a conversão custa
+    mais que o ganho em requisições e o TelcoPreprocessor consulta texto direto.
+    """
+    if request_content_type == ARROW_CONTENT_TYPE:
+        data = read_arrow(request_body)
+    elif request_content_type == NPY_CONTENT_TYPE:
+        data = read_npy(request_body)
     else:
-        raise ValueError(f"Content type {request_content_type} não suportado")
-    
-    # (O restante do código permanece o mesmo)
-    # Excluir a coluna 'customerID' (se presente)
-    data = data.drop(columns=['customerID'], errors='ignore')
+        data = read_input(StringIO(request_body), request_content_type)
 
-    # Converter a coluna 'TotalCharges' para numérico, tratando valores inválidos
-    data['TotalCharges'] = pd.to_numeric(data['TotalCharges'], errors='coerce')
+    # Colunas faltantes são rejeitadas já na leitura: no serve.py o lote de várias requisições
+    # é concatenado, e a falta de uma coluna viraria NaN em vez de erro
+    if not isinstance(data, np.ndarray):
+        missing = [col for col in NUMERIC_COLUMNS + CATEGORICAL_COLUMNS if col not in data.columns]
+        if missing:
+            raise ValueError("Colunas ausentes na requisição: {}".format(', '.join(missing)))
 
-    # Preencher valores faltantes na coluna 'TotalCharges' com a mediana
-    data['TotalCharges'].fillna(data['TotalCharges'].median(), inplace=True)
+    if metrics.SINKS:
+        # Tamanho em bytes: corpos de texto são medidos já codificados em UTF-8
+        payload_bytes = len(request_body.encode('utf-8')) if isinstance(request_body, str) else len(request_body)
+        metrics.observe('payload_bytes', payload_bytes, content_type=request_content_type)
+        metrics.observe('request_rows', len(data))
+    return data
+
+
+def read_input(source, content_type):
+    """Ler CSV/JSON de um arquivo ou buffer"""
+    if content_type == 'application/json':
+        return pd.read_json(source, orient='records')
+    elif content_type == 'application/jsonlines':
+        return pd.read_json(source, orient='records', lines=True)
+    elif content_type == 'text/csv':
+        return pd.read_csv(source)
+    else:
+        raise ValueError(f"Content type {content_type} não suportado")
 
-    # As colunas categóricas que precisam ser codificadas
-    categorical_columns = ['gender', 'Partner', 'Dependents', 'PhoneService', 'MultipleLines', 
-                           'InternetService', 'OnlineSecurity', 'OnlineBackup', 'DeviceProtection', 
-                           'TechSupport', 'StreamingTV', 'StreamingMovies', 'Contract', 
-                           'PaperlessBilling', 'PaymentMethod']
 
-    # Retorna os dados pré-processados e as colunas categóricas para codificação
-    return data, categorical_columns
+def read_arrow(body):
+    """Ler um stream Arrow IPC; colunas numéricas sem nulos chegam ao pandas sem cópia"""
+    import pyarrow as pa
+
+    table = pa.ipc.open_stream(body).read_all()
+    return table.to_pandas(split_blocks=True)
+
+
+def read_npy(body):
+    """Ler um .npy com as features já codificadas, usando o próprio buffer da requisição (sem cópia)"""
+    buffer = BytesIO(body)
+    version = np.lib.format.read_magic(buffer)
+    if version == (1, 0):
+        shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(buffer)
+    else:
+        shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(buffer)
+    if dtype.hasobject or len(shape) != 2:
+        raise ValueError("O .npy deve conter uma matriz numérica de features (linhas x colunas)")
+
+    count = shape[0] * shape[1]
+    array = np.frombuffer(body, dtype=dtype, count=count, offset=buffer.tell())
+    return array.reshape(shape, order='F' if fortran_order else 'C')
 
 
 # Função para fazer a predição com o modelo
-def predict_fn(input_data, model_and_encoder):
-    """Executa a inferência usando o modelo e o encoder"""
-    model, encoder = model_and_encoder
+def predict_fn(input_data, model_and_preprocessor, mode=None, output=None, top_k=None, reasons=None):
+    """Executa a inferência usando o modelo e o pré-processamento de treino
 
-    # Aplicar o OneHotEncoder nas colunas categóricas
-    data, categorical_columns = input_data
+    Retorna um dicionário de arrays: {'predictions': rótulos} na saída 'label', ou
+    {'customerID': ..., 'probabilities': ...} na saída 'probability'. Com top_k,
+    apenas os clientes de maior probabilidade, em ordem decrescente; sem a coluna
+    'customerID' na entrada, a chave passa a ser a posição da linha ('index').
+    Com reasons=N, inclui os N principais motivos de cada linha retornada.
+    """
+    probabilities = predict_proba(input_data, model_and_preprocessor, mode=mode)
+    result = format_prediction(input_data, probabilities, output=output, top_k=top_k)
 
-    # Codificar as colunas categóricas
-    encoded_features = encoder.transform(data[categorical_columns])
+    reasons = reasons if reasons is not None else REASONS
+    if reasons:
+        # Com top_k, só os clientes selecionados são explicados
+        top_k = top_k if top_k is not None else TOP_K
+        if top_k is not None:
+            rows = top_k_indices(probabilities, resolve_top_k(top_k, len(probabilities)))
+            input_data = input_data[rows] if isinstance(input_data, np.ndarray) else input_data.iloc[rows]
+        result.update(reason_codes(input_data, model_and_preprocessor, reasons))
+    return result
 
-    # Criar um DataFrame com as colunas categóricas codificadas
-    encoded_df = pd.DataFrame(encoded_features, columns=encoder.get_feature_names(categorical_columns))
 
-    # Remover as colunas categóricas originais e adicionar as codificadas
-    data = data.drop(columns=categorical_columns)
-    data.reset_index(drop=True, inplace=True)
-    encoded_df.reset_index(drop=True, inplace=True)
-    data = pd.concat([data, encoded_df], axis=1)
+def predict_proba(input_data, model_and_preprocessor, mode=None):
+    """Probabilidade de churn de cada linha (pré-processamento + modelo)
 
-    # Fazer a predição com o modelo
-    predictions = model.predict(data)
-    return predictions
+    Com o cache ativo, linhas já vistas são respondidas pelo cache e apenas as
+    demais passam pela codificação e pelo modelo.
+    """
+    if PREDICTION_CACHE is not None and not isinstance(input_data, np.ndarray):
+        keys = PREDICTION_CACHE.row_keys(input_data)
+        probabilities, missing = PREDICTION_CACHE.lookup(keys)
+        if missing.any():
+            computed = _predict_proba(input_data[missing], model_and_preprocessor, mode)
+            probabilities[missing] = computed
+            PREDICTION_CACHE.store(keys[missing], computed)
+        return probabilities
+    return _predict_proba(input_data, model_and_preprocessor, mode)
 
-# Função para retornar os resultados no formato adequado (JSON)
+
+def _predict_proba(input_data, model_and_preprocessor, mode=None):
+    model, preprocessor = model_and_preprocessor
+    mode = mode or PREDICT_MODE
+
+    # Etapas medidas separadamente: codificação das features e avaliação do modelo
+    with metrics.timer('encode'):
+        if isinstance(input_data, np.ndarray):
+            # Features já codificadas (.npy): vão direto ao modelo, sem pré-processamento
+            if preprocessor.sparse:
+                raise ValueError("Modelo treinado com features esparsas não aceita matriz densa já codificada")
+            if preprocessor.categorical:
+                raise ValueError("Modelo treinado com categóricas nativas não aceita matriz já codificada")
+            if input_data.shape[1] != len(preprocessor.feature_names_):
+                raise ValueError("Esperadas {} features, recebidas {}".format(
+                    len(preprocessor.feature_names_), input_data.shape[1]))
+            features = input_data
+            if mode == 'dataframe':
+                features = pd.DataFrame(features, columns=preprocessor.feature_names_)
+        elif mode == 'numpy':
+            # Caminho rápido: codificação direta na matriz float32, sem DataFrame intermediário
+            # (no modo categórico, colunas 'category' sem one-hot)
+            features = preprocessor.transform_array(input_data)
+        elif mode == 'dataframe':
+            # Aplicar o pré-processamento ajustado no treino (apenas consultas, sem estatísticas do lote)
+            features = preprocessor.transform(input_data)
+        else:
+            raise ValueError(f"Modo de predição {mode} não suportado")
+
+    with metrics.timer('model'):
+        if mode == 'numpy':
+            return model.get_booster().inplace_predict(features)
+        elif mode == 'dataframe':
+            return model.predict_proba(features)[:, 1]
+        else:
+            raise ValueError(f"Modo de predição {mode} não suportado")
+
+
+def reason_codes(input_data, model_and_preprocessor, n_reasons, batch_rows=None):
+    """Os n_reasons motivos que mais aumentam o risco de churn de cada linha
+
+    As contribuições SHAP do lote inteiro vêm de uma única chamada ao booster por
+    bloco (pred_contribs=True); as colunas one-hot são somadas de volta às 15
+    colunas categóricas originais. A memória fica limitada a um bloco de batch_rows
+    linhas de contribuições. Retorna {'reason_1': nomes, 'reason_1_contribution':
+    contribuições em log-odds, ...}, em ordem decrescente de contribuição.
+    """
+    import xgboost as xgb
+
+    model, preprocessor = model_and_preprocessor
+    booster = model.get_booster()
+    batch_rows = batch_rows or REASONS_BATCH_ROWS
+    names = np.array(NUMERIC_COLUMNS + CATEGORICAL_COLUMNS, dtype=object)
+    n_reasons = min(n_reasons, len(names))
+
+    top = np.empty((len(input_data), n_reasons), dtype=np.int64)
+    values = np.empty((len(input_data), n_reasons), dtype=np.float32)
+    for start in range(0, len(input_data), batch_rows):
+        if isinstance(input_data, np.ndarray):
+            features = input_data[start:start + batch_rows]
+        else:
+            features = preprocessor.transform_array(input_data.iloc[start:start + batch_rows])
+        # A ordem das colunas é garantida pelo pré-processamento (modelos treinados com ou sem nomes)
+        contributions = booster.predict(xgb.DMatrix(features, enable_categorical=preprocessor.categorical),
+                                        pred_contribs=True, validate_features=False)
+        # A última coluna é o viés (valor esperado), que não é um motivo
+        folded = preprocessor.fold_contributions(contributions[:, :-1])
+
+        candidates = np.argpartition(-folded, n_reasons - 1, axis=1)[:, :n_reasons]
+        order = np.argsort(-np.take_along_axis(folded, candidates, axis=1), axis=1, kind='stable')
+        selected = np.take_along_axis(candidates, order, axis=1)
+        top[start:start + batch_rows] = selected
+        values[start:start + batch_rows] = np.take_along_axis(folded, selected, axis=1)
+
+    result = {}
+    for i in range(n_reasons):
+        result['reason_{}'.format(i + 1)] = names[top[:, i]]
+        result['reason_{}_contribution'.format(i + 1)] = values[:, i]
+    return result
+
+
+def format_prediction(input_data, probabilities, output=None, top_k=None):
+    """Monta o resultado de predict_fn a partir das probabilidades de cada linha"""
+    output = output or OUTPUT
+    top_k = top_k if top_k is not None else TOP_K
+
+    if output == 'label' and top_k is None:
+        return {'predictions': (probabilities > 0.5).astype(np.int64)}
+    elif output not in ('label', 'probability'):
+        raise ValueError(f"Saída {output} não suportada")
+
+    # Mantém o 'customerID' como chave de cada probabilidade
+    if 'customerID' in getattr(input_data, 'columns', ()):
+        key, ids = 'customerID', input_data['customerID'].to_numpy()
+    else:
+        key, ids = 'index', np.arange(len(probabilities))
+
+    if top_k is not None:
+        selected = top_k_indices(probabilities, resolve_top_k(top_k, len(probabilities)))
+        return {key: ids[selected], 'probabilities': probabilities[selected]}
+    return {key: ids, 'probabilities': probabilities}
+
+
+def resolve_top_k(top_k, n_rows):
+    """Converte top_k em número de clientes: frações (0 < top_k < 1) são relativas ao lote"""
+    if 0 < top_k < 1:
+        return int(np.ceil(top_k * n_rows))
+    return int(top_k)
+
+
+def top_k_indices(scores, k):
+    """Índices dos k maiores scores em ordem decrescente, via ordenação parcial (argpartition)"""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    # Apenas os k selecionados são ordenados, não o lote inteiro
+    return candidates[np.argsort(-scores[candidates], kind='stable')]
+
+# Função para retornar os resultados no formato adequado (JSON, Arrow IPC ou .npy)
+@metrics.timed('output_fn')
 def output_fn(prediction, accept='application/json'):
-    """Retorna o resultado da inferência no formato JSON"""
+    """Retorna o resultado da inferência no formato solicitado"""
     if accept == 'application/json':
-        return json.dumps({'predictions': prediction.tolist()})
+        return json.dumps({name: values.tolist() for name, values in prediction.items()})
+    elif accept == ARROW_CONTENT_TYPE:
+        import pyarrow as pa
+
+        table = pa.table(prediction)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+    elif accept == NPY_CONTENT_TYPE:
+        # Um único campo vira um array simples; vários campos, um array estruturado (sem pickle)
+        if len(prediction) == 1:
+            array = next(iter(prediction.values()))
+        else:
+            array = np.rec.fromarrays([np.asarray(values, dtype=str) if values.dtype == object else values
+                                       for values in prediction.values()],
+                                      names=list(prediction))
+        buffer = BytesIO()
+        np.save(buffer, array, allow_pickle=False)
+        return buffer.getvalue()
     else:
         raise ValueError(f"Tipo de saída {accept} não suportado")
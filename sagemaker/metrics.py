@@ -0,0 +1,155 @@
+import functools
+import logging
+import os
+import threading
+import time
+from contextlib import nullcontext
+
+# Limites dos histogramas de cada métrica (o último intervalo, +Inf, é implícito)
+SECONDS_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+BUCKETS = {
+    'stage_seconds': SECONDS_BUCKETS,
+    'model_load_seconds': SECONDS_BUCKETS,
+    'request_rows': (1, 10, 100, 1000, 10000, 100000, 1000000),
+    'payload_bytes': (1e2, 1e3, 1e4, 1e5, 1e6, 1e7, 1e8),
+}
+
+# Sinks ativos; sem nenhum, a instrumentação se reduz a um teste de lista vazia
+SINKS = []
+
+_NULL_TIMER = nullcontext()
+
+
+class LogSink:
+    """Uma linha de log por medição
+
+    Sem logging configurado pela aplicação, o logger recebe o próprio handler (stderr,
+    nível INFO), para que as linhas apareçam também no serve.py e no endpoint.
+    """
+
+    def __init__(self, logger_name='telco.metrics'):
+        self.logger = logging.getLogger(logger_name)
+        if not self.logger.handlers:
+            handler = logging.StreamHandler()
+            handler.setFormatter(logging.Formatter('%(asctime)s %(name)s %(message)s'))
+            self.logger.addHandler(handler)
+            self.logger.setLevel(logging.INFO)
+            # Evita linhas duplicadas se o root logger também tiver handlers
+            self.logger.propagate = False
+
+    def observe(self, name, value, labels):
+        self.logger.info('%s%s %.6g', name, _format_labels(labels), value)
+
+
+class MemorySink:
+    """Guarda as medições em memória (name, labels, valor), para testes e benchmarks"""
+
+    def __init__(self):
+        self.records = []
+
+    def observe(self, name, value, labels):
+        self.records.append((name, labels, value))
+
+    def values(self, name, **labels):
+        """Valores observados de uma métrica, filtrados pelos rótulos informados"""
+        return [value for record_name, record_labels, value in self.records
+                if record_name == name and all(record_labels.get(k) == v for k, v in labels.items())]
+
+
+class PrometheusSink:
+    """Histogramas acumulados, expostos no formato texto do Prometheus (GET /metrics no serve.py)"""
+
+    def __init__(self, prefix='telco_'):
+        self.prefix = prefix
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, value, labels):
+        buckets = BUCKETS.get(name, SECONDS_BUCKETS)
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            counts, total = self._histograms.get(key, ([0] * (len(buckets) + 1), 0.0))
+            # Contagem não cumulativa por intervalo; a soma cumulativa é feita só na exposição
+            position = next((i for i, bound in enumerate(buckets) if value <= bound), len(buckets))
+            counts[position] += 1
+            self._histograms[key] = (counts, total + value)
+
+    def render(self):
+        """Texto de exposição do Prometheus (histogramas com _bucket, _sum e _count)"""
+        lines = []
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+        declared = set()
+        for (name, labels), (counts, total) in histograms:
+            metric = self.prefix + name
+            if metric not in declared:
+                lines.append('# TYPE {} histogram'.format(metric))
+                declared.add(metric)
+            labels = dict(labels)
+            cumulative = 0
+            for bound, count in zip(list(BUCKETS.get(name, SECONDS_BUCKETS)) + ['+Inf'], counts):
+                cumulative += count
+                le = bound if bound == '+Inf' else '{:g}'.format(bound)
+                lines.append('{}_bucket{} {}'.format(metric, _format_labels(dict(labels, le=le)), cumulative))
+            lines.append('{}_sum{} {}'.format(metric, _format_labels(labels), total))
+            lines.append('{}_count{} {}'.format(metric, _format_labels(labels), cumulative))
+        return '\n'.join(lines) + '\n'
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join('{}="{}"'.format(key, value) for key, value in labels.items()) + '}'
+
+
+def configure(names):
+    """Ativa os sinks pelo nome ('log', 'prometheus', 'memory'), separados por vírgula"""
+    factories = {'log': LogSink, 'prometheus': PrometheusSink, 'memory': MemorySink}
+    SINKS[:] = [factories[name.strip()]() for name in names.split(',') if name.strip()]
+    return SINKS
+
+
+def get_sink(sink_type):
+    """Primeiro sink ativo do tipo informado (ou None)"""
+    return next((sink for sink in SINKS if isinstance(sink, sink_type)), None)
+
+
+def observe(name, value, **labels):
+    """Registra uma medição em todos os sinks ativos"""
+    for sink in SINKS:
+        sink.observe(name, value, labels)
+
+
+class _Timer:
+    __slots__ = ('stage', 'start')
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        observe('stage_seconds', time.perf_counter() - self.start, stage=self.stage)
+
+
+def timer(stage):
+    """Context manager que mede o tempo de uma etapa; sem sinks ativos, não mede nada"""
+    return _Timer(stage) if SINKS else _NULL_TIMER
+
+
+def timed(stage):
+    """Decorador equivalente a timer() para uma função inteira"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not SINKS:
+                return fn(*args, **kwargs)
+            with _Timer(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# Sinks definidos pela variável de ambiente (ex.: TELCO_METRICS=log,prometheus); vazio = desativado
+configure(os.environ.get('TELCO_METRICS', ''))
@@ -0,0 +1,71 @@
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+from preprocessing import NUMERIC_COLUMNS, CATEGORICAL_COLUMNS
+
+
+class PredictionCache:
+    """Cache em memória das probabilidades por cliente, com limite LRU e expiração (TTL)
+
+    A chave é (versão do modelo, hash das colunas usadas pelo modelo). As colunas
+    são normalizadas antes do hash (numéricas como float, categóricas como texto),
+    de modo que a mesma linha recebida em CSV ou JSON cai na mesma entrada e linhas
+    repetidas não passam pela codificação nem pelo modelo.
+    """
+
+    def __init__(self, max_entries=100000, ttl_seconds=86400, model_version=''):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.model_version = model_version
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def row_keys(self, data):
+        """Hash estável (uint64) de cada linha, calculado de forma vetorizada"""
+        normalized = pd.DataFrame({
+            **{col: pd.to_numeric(data[col], errors='coerce').astype('float64') for col in NUMERIC_COLUMNS},
+            **{col: data[col].astype(str) for col in CATEGORICAL_COLUMNS},
+        })
+        return pd.util.hash_pandas_object(normalized, index=False).to_numpy()
+
+    def lookup(self, keys):
+        """Retorna (probabilidades, máscara das linhas não encontradas); ausentes ficam NaN"""
+        probabilities = np.full(len(keys), np.nan, dtype=np.float32)
+        now = time.monotonic()
+        with self._lock:
+            for i, key in enumerate(keys.tolist()):
+                entry = self._entries.get((self.model_version, key))
+                if entry is None:
+                    continue
+                value, expires_at = entry
+                if expires_at <= now:
+                    del self._entries[(self.model_version, key)]
+                    continue
+                self._entries.move_to_end((self.model_version, key))
+                probabilities[i] = value
+        missing = np.isnan(probabilities)
+        n_missing = int(missing.sum())
+        self.hits += len(keys) - n_missing
+        self.misses += n_missing
+        return probabilities, missing
+
+    def store(self, keys, probabilities):
+        """Armazena as probabilidades calculadas, descartando as entradas menos usadas"""
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            for key, value in zip(keys.tolist(), probabilities.tolist()):
+                self._entries[(self.model_version, key)] = (value, expires_at)
+                self._entries.move_to_end((self.model_version, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        """Contadores de acertos/falhas e tamanho atual do cache"""
+        total = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries),
+                'hit_rate': self.hits / total if total else 0.0}
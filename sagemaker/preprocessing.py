@@ -0,0 +1,240 @@
+import json
+import numpy as np
+import pandas as pd
+
+# Colunas do dataset Telco utilizadas pelo modelo
+ID_COLUMN = 'customerID'
+TARGET_COLUMN = 'Churn'
+
+NUMERIC_COLUMNS = ['SeniorCitizen', 'tenure', 'MonthlyCharges', 'TotalCharges']
+
+CATEGORICAL_COLUMNS = ['gender', 'Partner', 'Dependents', 'PhoneService', 'MultipleLines',
+                       'InternetService', 'OnlineSecurity', 'OnlineBackup', 'DeviceProtection',
+                       'TechSupport', 'StreamingTV', 'StreamingMovies', 'Contract',
+                       'PaperlessBilling', 'PaymentMethod']
+
+# Tipos compactos do dataset: categóricas como 'category', inteiros pequenos e cobranças em float32
+SCHEMA = {
+    **{col: 'category' for col in CATEGORICAL_COLUMNS},
+    'SeniorCitizen': 'int8',
+    'tenure': 'int16',
+    'MonthlyCharges': 'float32',
+    'TotalCharges': 'float32',
+}
+
+# Tipos aplicados já na leitura do CSV nos carregamentos em massa ('TotalCharges' tem valores
+# em branco e os inteiros podem ter faltantes; essas colunas são convertidas por apply_schema)
+CSV_DTYPES = {col: dtype for col, dtype in SCHEMA.items()
+              if dtype in ('category', 'float32') and col != 'TotalCharges'}
+
+
+def apply_schema(df):
+    """Converte as colunas presentes para os tipos do SCHEMA
+
+    Valores numéricos inválidos viram NaN; colunas inteiras com faltantes ficam em float32.
+    """
+    for col, dtype in SCHEMA.items():
+        if col not in df.columns:
+            continue
+        if dtype == 'category':
+            if not isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = df[col].astype('category')
+            continue
+        values = pd.to_numeric(df[col], errors='coerce')
+        if np.issubdtype(np.dtype(dtype), np.integer) and values.isna().any():
+            dtype = 'float32'
+        df[col] = values.astype(dtype)
+    return df
+
+
+def category_positions(index, values):
+    """Posição de cada valor no vocabulário de treino (-1 para categorias desconhecidas)"""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # Consulta apenas as categorias distintas e expande pelos códigos (código -1 = faltante)
+        table = np.append(index.get_indexer(values.cat.categories.astype(str)), -1)
+        return table[values.cat.codes.to_numpy()]
+    return index.get_indexer(values.astype(str))
+
+
+class TelcoPreprocessor:
+    """Pré-processamento ajustado no treino e reaplicado na inferência
+
+    Guarda as estatísticas de treino (mediana de 'TotalCharges', vocabulário de
+    cada coluna categórica e a ordem das features) para que a inferência faça
+    apenas consultas, sem recalcular nada a partir do lote recebido.
+
+    Com sparse=True as features são geradas como matriz CSR, tanto no treino
+    quanto na inferência. Para o XGBoost, entradas ausentes da CSR são valores
+    faltantes (e não zeros), por isso o modelo deve ser servido no mesmo formato
+    em que foi treinado.
+
+    Com categorical=True não há one-hot: as 15 colunas categóricas são entregues
+    como pandas 'category' com o vocabulário de treino (categorias desconhecidas
+    viram faltantes), para o XGBoost com enable_categorical=True.
+    """
+
+    # Padrão para pré-processamentos salvos antes da opção categorical
+    categorical = False
+
+    def __init__(self, sparse=False, categorical=False):
+        if sparse and categorical:
+            raise ValueError("As opções sparse e categorical não podem ser usadas juntas")
+        self.sparse = sparse
+        self.categorical = categorical
+
+    def fit(self, df):
+        """Captura as estatísticas de treino"""
+        total_charges = pd.to_numeric(df['TotalCharges'], errors='coerce')
+        self.total_charges_median_ = float(total_charges.median())
+
+        # Mesma ordem (alfabética) usada pelo OneHotEncoder do scikit-learn
+        self.categories_ = {
+            col: sorted(set(map(str, df[col].dropna().unique())))
+            for col in CATEGORICAL_COLUMNS
+        }
+        return self._build_tables()
+
+    def _build_tables(self):
+        """Deriva as tabelas de consulta a partir da mediana e do vocabulário"""
+        # Nomes no formato '<coluna>_<categoria>', como em get_feature_names(), e tabelas
+        # categoria -> posição com o deslocamento de cada coluna na matriz de features
+        self.feature_names_ = list(NUMERIC_COLUMNS)
+        self.category_columns_ = {}
+        for col in CATEGORICAL_COLUMNS:
+            categories = self.categories_[col]
+            self.category_columns_[col] = (pd.Index(categories), len(self.feature_names_))
+            self.feature_names_.extend('{}_{}'.format(col, cat) for cat in categories)
+
+        # Sem one-hot, cada coluna categórica é uma única feature
+        if self.categorical:
+            self.feature_names_ = NUMERIC_COLUMNS + CATEGORICAL_COLUMNS
+        return self
+
+    def transform(self, df):
+        """Aplica o pré-processamento ajustado e retorna as features do modelo"""
+        X = self.transform_array(df)
+        if self.sparse or self.categorical:
+            return X
+        return pd.DataFrame(X, columns=self.feature_names_)
+
+    def transform_array(self, df):
+        """Mesmo que transform(), mas retorna a matriz float32 (ou CSR) sem criar um DataFrame
+
+        No modo categorical o resultado é sempre um DataFrame, que carrega as categorias.
+        """
+        if self.sparse:
+            return self._transform_sparse(df)
+        if self.categorical:
+            return self._transform_categorical(df)
+
+        n_rows = len(df)
+        X = np.zeros((n_rows, len(self.feature_names_)), dtype=np.float32)
+
+        # Colunas numéricas, com 'TotalCharges' imputada pela mediana de treino
+        for i, col in enumerate(NUMERIC_COLUMNS):
+            values = pd.to_numeric(df[col], errors='coerce')
+            if col == 'TotalCharges':
+                values = values.fillna(self.total_charges_median_)
+            X[:, i] = values.to_numpy(dtype=np.float32)
+
+        # One-hot por consulta às tabelas categoria -> coluna; categorias desconhecidas ficam zeradas
+        rows = np.arange(n_rows)
+        for col in CATEGORICAL_COLUMNS:
+            index, offset = self.category_columns_[col]
+            positions = category_positions(index, df[col])
+            known = positions >= 0
+            X[rows[known], offset + positions[known]] = 1.0
+
+        return X
+
+    def _transform_sparse(self, df):
+        """Monta a CSR diretamente: as colunas numéricas e uma entrada por coluna categórica conhecida"""
+        from scipy import sparse as sp
+
+        n_rows = len(df)
+        n_cols = len(NUMERIC_COLUMNS) + len(CATEGORICAL_COLUMNS)
+        columns = np.empty((n_rows, n_cols), dtype=np.int32)
+        values = np.ones((n_rows, n_cols), dtype=np.float32)
+
+        for i, col in enumerate(NUMERIC_COLUMNS):
+            numeric = pd.to_numeric(df[col], errors='coerce')
+            if col == 'TotalCharges':
+                numeric = numeric.fillna(self.total_charges_median_)
+            columns[:, i] = i
+            values[:, i] = numeric.to_numpy(dtype=np.float32)
+
+        for i, col in enumerate(CATEGORICAL_COLUMNS, start=len(NUMERIC_COLUMNS)):
+            index, offset = self.category_columns_[col]
+            positions = category_positions(index, df[col])
+            columns[:, i] = np.where(positions >= 0, offset + positions, -1)
+
+        # Categorias desconhecidas não geram entrada; as colunas já estão em ordem crescente por linha
+        known = columns >= 0
+        if known.all():
+            # Caso comum: todas as linhas têm n_cols entradas e os buffers são usados sem cópia
+            indptr = np.arange(0, n_rows * n_cols + 1, n_cols, dtype=np.int64)
+            data, indices = values.ravel(), columns.ravel()
+        else:
+            indptr = np.zeros(n_rows + 1, dtype=np.int64)
+            np.cumsum(known.sum(axis=1), out=indptr[1:])
+            data, indices = values[known], columns[known]
+        return sp.csr_matrix((data, indices, indptr), shape=(n_rows, len(self.feature_names_)))
+
+    def _transform_categorical(self, df):
+        """Colunas numéricas em float32 e categóricas como 'category' com o vocabulário de treino"""
+        columns = {}
+        for col in NUMERIC_COLUMNS:
+            values = pd.to_numeric(df[col], errors='coerce')
+            if col == 'TotalCharges':
+                values = values.fillna(self.total_charges_median_)
+            columns[col] = values.to_numpy(dtype=np.float32)
+
+        # Os códigos são as posições no vocabulário de treino (-1 = faltante ou desconhecida)
+        for col in CATEGORICAL_COLUMNS:
+            index, _ = self.category_columns_[col]
+            columns[col] = pd.Categorical.from_codes(category_positions(index, df[col]), categories=index)
+
+        return pd.DataFrame(columns)
+
+    def fold_contributions(self, contributions):
+        """Soma as contribuições (SHAP) das colunas one-hot de cada coluna categórica
+
+        Recebe uma matriz linhas x features do modelo e retorna linhas x colunas
+        originais, na ordem NUMERIC_COLUMNS + CATEGORICAL_COLUMNS.
+        """
+        if self.categorical:
+            return contributions
+        # As colunas one-hot de cada categórica são contíguas, a partir do seu deslocamento
+        starts = list(range(len(NUMERIC_COLUMNS))) + [offset for _, offset in self.category_columns_.values()]
+        return np.add.reduceat(contributions, starts, axis=1)
+
+    def unseen_categories(self, df):
+        """Categorias de df ausentes do vocabulário de treino, por coluna (codificadas como desconhecidas)"""
+        unseen = {}
+        for col in CATEGORICAL_COLUMNS:
+            index, _ = self.category_columns_[col]
+            values = pd.Index(df[col].dropna().astype(str).unique()).difference(index)
+            if len(values):
+                unseen[col] = values.tolist()
+        return unseen
+
+    def fit_transform(self, df):
+        """Ajusta e transforma em um único passo"""
+        return self.fit(df).transform(df)
+
+    def save(self, path):
+        """Grava as estatísticas de treino em JSON (sem pickle, independente da versão das bibliotecas)"""
+        with open(path, 'w') as target:
+            json.dump({'sparse': self.sparse, 'categorical': self.categorical,
+                       'total_charges_median': self.total_charges_median_,
+                       'categories': self.categories_}, target, indent=1)
+
+    @classmethod
+    def load(cls, path):
+        """Recria o pré-processamento ajustado a partir do JSON gravado por save()"""
+        with open(path) as source:
+            state = json.load(source)
+        preprocessor = cls(sparse=state['sparse'], categorical=state['categorical'])
+        preprocessor.total_charges_median_ = state['total_charges_median']
+        preprocessor.categories_ = state['categories']
+        return preprocessor._build_tables()
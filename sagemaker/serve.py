@@ -0,0 +1,163 @@
+import argparse
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+import pandas as pd
+
+import metrics
+from inference import (model_fn, input_fn, predict_proba, format_prediction, output_fn,
+                       ARROW_CONTENT_TYPE, NPY_CONTENT_TYPE)
+
+# Formatos cujo corpo é repassado em bytes para input_fn; os demais são decodificados como texto
+BINARY_CONTENT_TYPES = (ARROW_CONTENT_TYPE, NPY_CONTENT_TYPE)
+
+
+class MicroBatcher:
+    """Agrupa requisições concorrentes em uma única chamada ao modelo
+
+    Cada requisição entra em uma fila; uma thread dedicada junta o que chegar em
+    até max_wait_ms (ou até max_batch_rows linhas), avalia o lote com uma única
+    chamada a predict_proba e devolve a cada requisição a sua fatia das probabilidades.
+    """
+
+    def __init__(self, model_and_preprocessor, max_batch_rows=1000, max_wait_ms=5.0):
+        self.model_and_preprocessor = model_and_preprocessor
+        self.max_batch_rows = max_batch_rows
+        self.max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def predict_proba(self, input_data):
+        """Enfileira a requisição e aguarda as probabilidades das suas linhas"""
+        future = Future()
+        self._queue.put((input_data, future))
+        return future.result()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            n_rows = len(batch[0][0])
+            deadline = time.perf_counter() + self.max_wait
+            while n_rows < self.max_batch_rows:
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                batch.append(item)
+                n_rows += len(item[0])
+
+            # DataFrames e matrizes .npy já codificadas são avaliados em grupos separados
+            frames = [item for item in batch if not isinstance(item[0], np.ndarray)]
+            arrays = [item for item in batch if isinstance(item[0], np.ndarray)]
+            for group in (frames, arrays):
+                if group:
+                    self._predict_group(group)
+
+    def _predict_group(self, group):
+        try:
+            if isinstance(group[0][0], np.ndarray):
+                combined = np.concatenate([data for data, _ in group])
+            else:
+                combined = pd.concat([data for data, _ in group], ignore_index=True)
+            probabilities = predict_proba(combined, self.model_and_preprocessor)
+        except Exception as error:
+            if len(group) == 1:
+                group[0][1].set_exception(error)
+                return
+            # Reavalia individualmente para que só a requisição inválida receba o erro
+            for item in group:
+                self._predict_group([item])
+            return
+
+        offset = 0
+        for data, future in group:
+            future.set_result(probabilities[offset:offset + len(data)])
+            offset += len(data)
+
+
+class InvocationsHandler(BaseHTTPRequestHandler):
+    """Contrato HTTP do SageMaker: GET /ping e POST /invocations"""
+
+    protocol_version = 'HTTP/1.1'
+    batcher = None
+
+    def do_GET(self):
+        prometheus = metrics.get_sink(metrics.PrometheusSink)
+        if self.path == '/ping':
+            self._respond(200, b'', 'text/plain')
+        elif self.path == '/metrics' and prometheus is not None:
+            self._respond(200, prometheus.render().encode('utf-8'), 'text/plain; version=0.0.4')
+        else:
+            self._respond(404, b'', 'text/plain')
+
+    def do_POST(self):
+        if self.path != '/invocations':
+            self._respond(404, b'', 'text/plain')
+            return
+
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        content_type = self.headers.get('Content-Type', 'application/json')
+        accept = self.headers.get('Accept', 'application/json')
+        if accept == '*/*':
+            accept = 'application/json'
+
+        try:
+            if content_type not in BINARY_CONTENT_TYPES:
+                body = body.decode('utf-8')
+            data = input_fn(body, content_type)
+            probabilities = self.batcher.predict_proba(data)
+            response = output_fn(format_prediction(data, probabilities), accept)
+        except (ValueError, KeyError) as error:
+            self._respond(400, str(error).encode('utf-8'), 'text/plain')
+            return
+
+        if isinstance(response, str):
+            response = response.encode('utf-8')
+        self._respond(200, response, accept)
+
+    def _respond(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Sem log por requisição no caminho quente
+        pass
+
+
+# Servidor local de inferência (fora do SageMaker): carrega o modelo uma única vez
+# na inicialização e expõe model_fn -> input_fn -> predict_fn -> output_fn via HTTP,
+# agrupando requisições concorrentes pequenas em uma única chamada ao modelo.
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--model-dir', type=str, required=True)
+    parser.add_argument('--host', type=str, default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--max-batch-rows', type=int, default=1000)
+    parser.add_argument('--max-wait-ms', type=float, default=5.0)
+    # Sinks de métricas separados por vírgula (log, prometheus); 'prometheus' expõe GET /metrics
+    parser.add_argument('--metrics', type=str, default=None)
+    args = parser.parse_args()
+
+    if args.metrics is not None:
+        metrics.configure(args.metrics)
+    # O sink 'memory' guarda todas as medições e cresceria sem limite em um servidor
+    if metrics.get_sink(metrics.MemorySink) is not None:
+        parser.error("o sink de métricas 'memory' não é aceito no servidor; use log ou prometheus")
+
+    InvocationsHandler.batcher = MicroBatcher(model_fn(args.model_dir),
+                                              max_batch_rows=args.max_batch_rows,
+                                              max_wait_ms=args.max_wait_ms)
+
+    server = ThreadingHTTPServer((args.host, args.port), InvocationsHandler)
+    print('Servindo em http://{}:{}/invocations'.format(args.host, args.port))
+    server.serve_forever()
@@ -1,9 +1,12 @@
 import argparse
 import os
-import pandas as pd
+import tempfile
+import time
 import joblib
 import xgboost as xgb
-from sklearn.preprocessing import OneHotEncoder
+from preprocessing import TelcoPreprocessor, TARGET_COLUMN
+from data_loading import load_dataset
+from inference import load_artifacts
 
 if __name__ == '__main__':
     # Ler os argumentos fornecidos pelo SageMaker
@@ -14,69 +17,110 @@ if __name__ == '__main__':
     parser.add_argument('--max_depth', type=int, default=5)
     parser.add_argument('--learning_rate', type=float, default=0.1)
 
+    # Codificação esparsa (CSR) das features: 1 = ativada, 0 = matriz densa
+    parser.add_argument('--sparse', type=int, default=0, choices=[0, 1])
+
+    # Categóricas nativas do XGBoost (sem one-hot, tree_method='hist'): 1 = ativada
+    parser.add_argument('--categorical', type=int, default=0, choices=[0, 1])
+
     # Diretórios de entrada e saída (para SageMaker)
     parser.add_argument('--model-dir', type=str, default=os.environ['SM_MODEL_DIR'])
     parser.add_argument('--train', type=str, default=os.environ['SM_CHANNEL_TRAIN'])
 
+    # Treino incremental: diretório com o modelo anterior; o treino continua a partir dele com
+    # n_estimators árvores adicionais, reaproveitando o vocabulário salvo (canal opcional 'base_model')
+    parser.add_argument('--base-model-dir', type=str, default=os.environ.get('SM_CHANNEL_BASE_MODEL'))
+
+    # Treino em memória externa (CSV maior que a RAM): 1 = ativado, com blocos de chunk_size linhas
+    # e as páginas do XGBoost gravadas em cache_dir
+    parser.add_argument('--external-memory', type=int, default=0, choices=[0, 1])
+    parser.add_argument('--chunk-size', type=int, default=100000)
+    parser.add_argument('--cache-dir', type=str, default=tempfile.gettempdir())
+
     args = parser.parse_args()
+    if args.sparse and args.categorical:
+        parser.error('--sparse e --categorical não podem ser usados juntos')
 
     # Caminho do arquivo de treinamento
     train_data_path = os.path.join(args.train, "train.csv")
-    df = pd.read_csv(train_data_path)
-    
-    print('Shape Train: {}'.format(df.shape))
-
-    ########################################################### Pré-processamento ###########################################################
 
-    # Excluir a coluna 'customerID'
-    if 'customerID' in df.columns:
-        df = df.drop(columns=['customerID'])
-
-    # Converter a coluna 'TotalCharges' para numérico e tratar valores faltantes
-    df['TotalCharges'] = pd.to_numeric(df['TotalCharges'], errors='coerce')
-    df['TotalCharges'].fillna(df['TotalCharges'].median(), inplace=True)
-
-    # Identificar as colunas categóricas
-    categorical_columns = ['gender', 'Partner', 'Dependents', 'PhoneService', 'MultipleLines',
-                           'InternetService', 'OnlineSecurity', 'OnlineBackup', 'DeviceProtection',
-                           'TechSupport', 'StreamingTV', 'StreamingMovies', 'Contract',
-                           'PaperlessBilling', 'PaymentMethod']
-
-    # Instanciar o OneHotEncoder e codificar as colunas categóricas
-    encoder = OneHotEncoder(sparse=False, handle_unknown='ignore')
-    X_encoded = encoder.fit_transform(df[categorical_columns])
+    if args.external_memory:
+        # Memória externa: o CSV é lido em blocos e codificado bloco a bloco pelo DataIter;
+        # o XGBoost mantém as páginas quantizadas em disco e a memória fica limitada ao bloco
+        from external_memory import fit_preprocessor, train_external_memory
+
+        if args.base_model_dir:
+            base_model, preprocessor, _ = load_artifacts(args.base_model_dir)
+        else:
+            base_model = None
+            preprocessor = fit_preprocessor(train_data_path, args.chunk_size,
+                                            sparse=bool(args.sparse), categorical=bool(args.categorical))
+
+        params = {'objective': 'binary:logistic', 'max_depth': args.max_depth,
+                  'learning_rate': args.learning_rate, 'eval_metric': 'logloss'}
+        start = time.perf_counter()
+        booster = train_external_memory(train_data_path, preprocessor, args.chunk_size, args.cache_dir, params,
+                                        args.n_estimators,
+                                        xgb_model=base_model.get_booster() if base_model is not None else None)
+        print('Tempo de treino: {:.2f}s ({} árvores no modelo)'.format(
+            time.perf_counter() - start, booster.num_boosted_rounds()))
+
+        # Mesmo tipo de modelo do treino em memória, para que inference.py não mude
+        model = xgb.XGBClassifier()
+        model.load_model(bytearray(booster.save_raw('ubj')))
+    else:
+        # Lido via cache colunar, convertido do CSV uma única vez
+        df = load_dataset(train_data_path)
+    
+        print('Shape Train: {}'.format(df.shape))
 
-    # Usar get_feature_names() ao invés de get_feature_names_out()
-    encoded_columns = encoder.get_feature_names(categorical_columns)
+        ########################################################### Pré-processamento ###########################################################
 
-    # Criar um DataFrame com as colunas codificadas
-    X_encoded_df = pd.DataFrame(X_encoded, columns=encoded_columns)
+        if args.base_model_dir:
+            # O modelo anterior só entende o vocabulário e a codificação com que foi treinado:
+            # o pré-processamento salvo é reaplicado e categorias novas ficam como desconhecidas
+            base_model, preprocessor, _ = load_artifacts(args.base_model_dir)
+            for col, categories in preprocessor.unseen_categories(df).items():
+                print('Aviso: categorias fora do vocabulário em {}: {}'.format(col, categories))
+            X = preprocessor.transform(df)
+        else:
+            # Ajustar o pré-processamento (mediana, vocabulário das categorias e ordem das features)
+            # uma única vez no treino; o mesmo objeto é reaplicado pelo inference.py
+            base_model = None
+            preprocessor = TelcoPreprocessor(sparse=bool(args.sparse), categorical=bool(args.categorical))
+            X = preprocessor.fit_transform(df)
 
-    # Remover as colunas categóricas originais e adicionar as codificadas
-    df = df.drop(columns=categorical_columns)
-    df = pd.concat([df.reset_index(drop=True), X_encoded_df.reset_index(drop=True)], axis=1)
+        ########################################################### Pré-processamento ###########################################################
 
-    ########################################################### Pré-processamento ###########################################################
+        # Variável alvo (y)
+        y = df[TARGET_COLUMN]
 
-    # Separar as features (X) da variável alvo (y)
-    X = df.drop('Churn', axis=1)
-    y = df['Churn']
 
+        # Parâmetros do modo categórico: as colunas 'category' são divididas por conjuntos de categorias
+        categorical_params = {'enable_categorical': True, 'tree_method': 'hist'} if preprocessor.categorical else {}
 
-    # Instanciar e treinar o modelo XGBoost
-    model = xgb.XGBClassifier(
-        n_estimators=args.n_estimators,
-        max_depth=args.max_depth,
-        learning_rate=args.learning_rate,
-        use_label_encoder=False,
-        eval_metric='logloss'
-    )
+        # Instanciar e treinar o modelo XGBoost
+        model = xgb.XGBClassifier(
+            n_estimators=args.n_estimators,
+            max_depth=args.max_depth,
+            learning_rate=args.learning_rate,
+            use_label_encoder=False,
+            eval_metric='logloss',
+            **categorical_params
+        )
 
-    model.fit(X, y)
+        start = time.perf_counter()
+        model.fit(X, y, xgb_model=base_model.get_booster() if base_model is not None else None)
+        print('Tempo de treino: {:.2f}s ({} árvores no modelo)'.format(
+            time.perf_counter() - start, model.get_booster().num_boosted_rounds()))
 
 
     # Salvar o modelo no diretório do SageMaker
     joblib.dump(model, os.path.join(args.model_dir, "model.joblib"))
 
-    # Salvar o encoder para uso futuro (opcional)
-    joblib.dump(encoder, os.path.join(args.model_dir, "encoder.joblib"))
+    # Salvar o pré-processamento ajustado para uso na inferência
+    joblib.dump(preprocessor, os.path.join(args.model_dir, "preprocessor.joblib"))
+
+    # Formatos nativos, preferidos pelo model_fn: booster em UBJSON e vocabulário em JSON
+    model.save_model(os.path.join(args.model_dir, "model.ubj"))
+    preprocessor.save(os.path.join(args.model_dir, "preprocessor.json"))
@@ -0,0 +1,153 @@
+import argparse
+import json
+import multiprocessing
+import os
+import time
+import numpy as np
+import xgboost as xgb
+from sklearn.metrics import log_loss, roc_auc_score
+from sklearn.model_selection import StratifiedKFold, train_test_split
+
+from preprocessing import TelcoPreprocessor, TARGET_COLUMN
+from data_loading import load_dataset
+
+# Folds (X_treino, y_treino, X_parada, y_parada, X_validação, y_validação) e threads do XGBoost do processo atual
+_folds = None
+_n_jobs = 1
+
+
+def _init_worker(folds, n_jobs):
+    """Recebe os folds já codificados uma única vez por worker"""
+    global _folds, _n_jobs
+    _folds = folds
+    _n_jobs = n_jobs
+
+
+def make_folds(df, n_folds, seed, sparse=False, stopping_fraction=0.2):
+    """Divide o dataset em k folds estratificados pelo Churn
+
+    De cada parte de treino é separada uma amostra (stopping_fraction) usada só na
+    parada antecipada, para que o fold de validação não influencie o número de
+    árvores e a métrica reportada não seja otimista. O pré-processamento é ajustado
+    apenas na parte de treino, como o train.py faria.
+    """
+    y = df[TARGET_COLUMN].to_numpy(dtype=np.int8)
+    folds = []
+    splitter = StratifiedKFold(n_splits=n_folds, shuffle=True, random_state=seed)
+    for train_index, valid_index in splitter.split(np.zeros(len(y)), y):
+        fit_index, stop_index = train_test_split(train_index, test_size=stopping_fraction,
+                                                 stratify=y[train_index], random_state=seed)
+        preprocessor = TelcoPreprocessor(sparse=sparse).fit(df.iloc[train_index])
+        folds.append((preprocessor.transform_array(df.iloc[fit_index]), y[fit_index],
+                      preprocessor.transform_array(df.iloc[stop_index]), y[stop_index],
+                      preprocessor.transform_array(df.iloc[valid_index]), y[valid_index]))
+    return folds
+
+
+def sample_configs(n_trials, rng):
+    """Sorteia as combinações de hiperparâmetros (taxa de aprendizado em escala logarítmica)"""
+    return [{'max_depth': int(rng.integers(3, 11)),
+             'learning_rate': float(10 ** rng.uniform(-2, np.log10(0.3)))}
+            for _ in range(n_trials)]
+
+
+def evaluate(task):
+    """Validação cruzada de uma configuração com até n_rounds árvores
+
+    Em cada fold a parada antecipada usa a amostra separada do treino e a métrica é
+    calculada só no fold de validação; retorna a logloss e a AUC médias, o número
+    médio de árvores úteis e o tempo do trial.
+    """
+    trial, params, n_rounds, early_stopping_rounds = task
+    start = time.perf_counter()
+    losses, aucs, rounds = [], [], []
+    for X_train, y_train, X_stop, y_stop, X_valid, y_valid in _folds:
+        model = xgb.XGBClassifier(
+            n_estimators=n_rounds,
+            eval_metric='logloss',
+            early_stopping_rounds=early_stopping_rounds,
+            n_jobs=_n_jobs,
+            **params
+        )
+        model.fit(X_train, y_train, eval_set=[(X_stop, y_stop)], verbose=False)
+        probabilities = model.predict_proba(X_valid)[:, 1]
+        losses.append(log_loss(y_valid, probabilities))
+        aucs.append(roc_auc_score(y_valid, probabilities))
+        rounds.append(model.best_iteration + 1)
+    return {'trial': trial, 'params': params, 'budget': n_rounds,
+            'logloss': float(np.mean(losses)), 'auc': float(np.mean(aucs)),
+            'n_estimators': int(round(np.mean(rounds))),
+            'seconds': time.perf_counter() - start}
+
+
+def successive_halving(pool, configs, min_rounds, max_rounds, eta, early_stopping_rounds):
+    """Avalia todas as configurações com poucas árvores e promove o melhor 1/eta a cada rodada
+
+    O orçamento (número máximo de árvores) é multiplicado por eta a cada rodada, até
+    max_rounds. Com eta=1 equivale a uma busca aleatória simples com max_rounds.
+    """
+    survivors = list(enumerate(configs))
+    budget = max_rounds if eta == 1 else min_rounds
+    results = []
+    while True:
+        tasks = [(trial, params, budget, early_stopping_rounds) for trial, params in survivors]
+        rung = sorted(pool.imap_unordered(evaluate, tasks), key=lambda result: result['logloss'])
+        for result in rung:
+            print('trial {:3d}  árvores<={:5d}  max_depth={:2d}  learning_rate={:.4f}  '
+                  'logloss={:.4f}  auc={:.4f}  n_estimators={:4d}  {:.2f}s'.format(
+                      result['trial'], result['budget'], result['params']['max_depth'],
+                      result['params']['learning_rate'], result['logloss'], result['auc'],
+                      result['n_estimators'], result['seconds']))
+        results.extend(rung)
+
+        if budget >= max_rounds or len(rung) == 1:
+            return rung[0], results
+        survivors = [(result['trial'], result['params']) for result in rung[:max(1, len(rung) // eta)]]
+        budget = min(budget * eta, max_rounds)
+
+
+# Busca local de hiperparâmetros para o train.py (sem SageMaker e sem rede): busca
+# aleatória com successive halving, validação cruzada k-fold e parada antecipada em uma
+# amostra separada de cada parte de treino; os trials rodam em paralelo, cada um com n_jobs limitado.
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--train', type=str, default=os.environ.get('SM_CHANNEL_TRAIN'))
+    parser.add_argument('--n-trials', type=int, default=27)
+    parser.add_argument('--folds', type=int, default=3)
+    parser.add_argument('--min-rounds', type=int, default=50)
+    parser.add_argument('--max-rounds', type=int, default=1000)
+    # Fator de eliminação do successive halving (1 = busca aleatória sem eliminação)
+    parser.add_argument('--eta', type=int, default=3)
+    parser.add_argument('--early-stopping-rounds', type=int, default=20)
+    # Fração de cada parte de treino reservada para a parada antecipada
+    parser.add_argument('--stopping-fraction', type=float, default=0.2)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--sparse', type=int, default=0, choices=[0, 1])
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', type=str, default=None)
+    args = parser.parse_args()
+
+    df = load_dataset(os.path.join(args.train, 'train.csv'))
+    folds = make_folds(df, args.folds, args.seed, sparse=bool(args.sparse), stopping_fraction=args.stopping_fraction)
+    configs = sample_configs(args.n_trials, np.random.default_rng(args.seed))
+
+    # Threads por trial: os núcleos são divididos entre os workers, sem oversubscription
+    workers = max(1, min(args.workers, args.n_trials))
+    n_jobs = max(1, (os.cpu_count() or 1) // workers)
+    print('{} trials, {} folds, {} workers x {} threads'.format(args.n_trials, args.folds, workers, n_jobs))
+
+    start = time.perf_counter()
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(folds, n_jobs)) as pool:
+        best, results = successive_halving(pool, configs, args.min_rounds, args.max_rounds, args.eta,
+                                           args.early_stopping_rounds)
+    elapsed = time.perf_counter() - start
+
+    print('Tempo total: {:.1f}s ({:.1f}s somando os trials)'.format(
+        elapsed, sum(result['seconds'] for result in results)))
+    print('Melhor configuração: logloss={:.4f}  auc={:.4f}'.format(best['logloss'], best['auc']))
+    print('  --n_estimators {} --max_depth {} --learning_rate {:.4f}'.format(
+        best['n_estimators'], best['params']['max_depth'], best['params']['learning_rate']))
+
+    if args.output:
+        with open(args.output, 'w') as target:
+            json.dump({'best': best, 'trials': results, 'seconds': elapsed}, target, indent=2)
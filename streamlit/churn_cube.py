@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+
+
+def _codes(values):
+    """Códigos inteiros e rótulos de uma coluna (categorias em ordem, -1 para faltantes)"""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy(), values.cat.categories
+    codes, uniques = pd.factorize(values, sort=True)
+    return codes, pd.Index(uniques)
+
+
+def build_churn_cube(data, columns, target='Churn'):
+    """Contagens de todas as combinações coluna x Churn, calculadas de uma só vez
+
+    Para cada coluna, o par (código da categoria, código do Churn) é convertido em um
+    índice único e contado com np.bincount, sem groupby. Retorna um dicionário
+    coluna -> DataFrame de contagens (linhas: categorias, colunas: valores de Churn).
+    """
+    target_codes, target_labels = _codes(data[target])
+    n_target = len(target_labels)
+
+    cube = {}
+    for col in columns:
+        codes, labels = _codes(data[col])
+        valid = (codes >= 0) & (target_codes >= 0)
+        flat = codes[valid].astype(np.int64) * n_target + target_codes[valid]
+        counts = np.bincount(flat, minlength=len(labels) * n_target).reshape(len(labels), n_target)
+        table = pd.DataFrame(counts, index=pd.Index(labels, name=col),
+                             columns=pd.Index(target_labels, name=target))
+        # Categorias sem nenhuma linha não aparecem nos gráficos, como no groupby
+        cube[col] = table[table.sum(axis=1) > 0]
+    return cube
+
+
+def churn_distribution(cube):
+    """Percentual de cada valor de Churn no dataset inteiro"""
+    counts = next(iter(cube.values())).sum(axis=0)
+    return counts / counts.sum() * 100
+
+
+def churn_proportions(cube, col):
+    """Proporção de Churn dentro de cada categoria (formato largo, para barras empilhadas)"""
+    counts = cube[col]
+    return counts.div(counts.sum(axis=1), axis=0)
+
+
+def churn_percent(cube, col):
+    """Percentual de Churn por categoria no formato longo (col, Churn, percent) usado pelo seaborn"""
+    proportions = churn_proportions(cube, col).mul(100)
+    return proportions.stack().rename('percent').reset_index()
+
+
+def binned_counts(data, col, bins=30, target='Churn'):
+    """Histograma exato de uma coluna numérica por valor de Churn, em uma única passada
+
+    Usa as mesmas bordas de np.histogram (último intervalo fechado à direita).
+    Retorna (bordas, DataFrame de contagens com linhas = intervalos e colunas = Churn).
+    """
+    values = data[col].to_numpy(dtype=np.float64)
+    target_codes, target_labels = _codes(data[target])
+    valid = ~np.isnan(values) & (target_codes >= 0)
+    edges = np.histogram_bin_edges(values[valid], bins=bins)
+
+    bin_index = np.clip(np.searchsorted(edges, values[valid], side='right') - 1, 0, bins - 1)
+    flat = bin_index * len(target_labels) + target_codes[valid]
+    counts = np.bincount(flat, minlength=bins * len(target_labels)).reshape(bins, len(target_labels))
+    return edges, pd.DataFrame(counts, columns=pd.Index(target_labels, name=target))
+
+
+def stratified_sample(data, size_per_class, target='Churn', seed=42):
+    """Amostra sem reposição de até size_per_class linhas de cada valor de Churn"""
+    rng = np.random.default_rng(seed)
+    target_codes, target_labels = _codes(data[target])
+    picked = []
+    for code in range(len(target_labels)):
+        rows = np.flatnonzero(target_codes == code)
+        picked.append(rng.choice(rows, size=min(size_per_class, len(rows)), replace=False))
+    return data.iloc[np.sort(np.concatenate(picked))]
+
+
+def dkw_bound(n, confidence=0.95):
+    """Erro máximo da distribuição acumulada empírica com n amostras (desigualdade DKW)"""
+    return np.sqrt(np.log(2 / (1 - confidence)) / (2 * n))
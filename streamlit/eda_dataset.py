@@ -1,35 +1,181 @@
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from io import BytesIO
 import streamlit as st
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+# Carregamento compartilhado (cache colunar) do diretório sagemaker/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'sagemaker'))
+from data_loading import load_dataset, file_hash
+from churn_cube import (build_churn_cube, churn_distribution, churn_percent, churn_proportions,
+                        binned_counts, stratified_sample, dkw_bound)
+
+# Serviços adicionais analisados individualmente
+ADDITIONAL_SERVICES = ['PhoneService', 'MultipleLines', 'OnlineSecurity', 'OnlineBackup', 'DeviceProtection', 'TechSupport', 'StreamingTV', 'StreamingMovies']
+
+# Colunas categóricas cruzadas com o Churn nos gráficos
+CUBE_COLUMNS = ['gender', 'SeniorCitizen', 'Dependents', 'InternetService', 'Contract', 'PaymentMethod',
+                'PaperlessBilling', 'Partner'] + ADDITIONAL_SERVICES
+
 # Configurações iniciais
 st.set_page_config(layout="wide")
 sns.set_style('whitegrid')
 
-# Função para carregar os dados
-@st.cache
-def load_data():
-    url = '../env/dataset/WA_Fn-UseC_-Telco-Customer-Churn.csv'
-    data = pd.read_csv(url)
-    data['TotalCharges'] = pd.to_numeric(data['TotalCharges'], errors='coerce')
+DATASET_PATH = '../env/dataset/WA_Fn-UseC_-Telco-Customer-Churn.csv'
+
+# Limites do cache de dados: versões do arquivo mantidas em memória e expiração (segundos)
+DATA_CACHE_MAX_ENTRIES = 2
+DATA_CACHE_TTL = 3600
+
+# Modo aproximado: ativado por padrão acima deste número de clientes; amostra padrão por classe de Churn
+APPROX_THRESHOLD = 200000
+DEFAULT_SAMPLE_SIZE = 5000
+
+# Número de intervalos dos histogramas pré-calculados
+HISTOGRAM_BINS = 30
+
+# Com Copy-on-Write (padrão no pandas >= 3), cópias rasas do frame em cache não copiam dados
+# e alterações nelas nunca chegam ao cache compartilhado
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
+
+def dataset_signature():
+    """Assinatura barata do arquivo (mtime, tamanho): muda sempre que o CSV é alterado"""
+    stat = os.stat(DATASET_PATH)
+    return stat.st_mtime_ns, stat.st_size
+
+# Função para carregar os dados (um objeto por versão do arquivo, sem rehash do DataFrame a cada acesso)
+@st.cache_resource(max_entries=DATA_CACHE_MAX_ENTRIES, ttl=DATA_CACHE_TTL)
+def _load_data(path, signature):
+    data = load_dataset(path)
     data['SeniorCitizen'] = data['SeniorCitizen'].replace({1: 'Yes', 0: 'No'})
     data.dropna(inplace=True)
     return data
 
-# Função principal do Streamlit
-def main():
-    # Título e Introdução
-    st.title("Análise Exploratória: Telco Customer Churn")
-    st.markdown("""
-    **Contexto:** Esta análise explora dados de clientes de uma empresa de telecomunicações,
-    buscando entender os fatores que influenciam o cancelamento de serviços (*churn*).
-    Vamos investigar como diferentes características dos clientes estão relacionadas ao churn.
-    """)
 
-    # Carregar os dados
+def load_data():
+    """Dataset em cache, como cópia rasa somente leitura do frame compartilhado"""
+    return _load_data(DATASET_PATH, dataset_signature()).copy(deep=False)
+
+# Contagens categoria x Churn de todos os gráficos, calculadas uma única vez por versão do arquivo
+@st.cache_resource(max_entries=DATA_CACHE_MAX_ENTRIES, ttl=DATA_CACHE_TTL)
+def _load_churn_cube(signature):
+    return build_churn_cube(load_data(), CUBE_COLUMNS)
+
+
+def load_churn_cube():
+    return _load_churn_cube(dataset_signature())
+
+# Histogramas exatos (pré-calculados) de tenure e MonthlyCharges por Churn
+@st.cache_resource(max_entries=DATA_CACHE_MAX_ENTRIES, ttl=DATA_CACHE_TTL)
+def _load_histograms(signature):
     data = load_data()
+    return {col: binned_counts(data, col, bins=HISTOGRAM_BINS) for col in ('tenure', 'MonthlyCharges')}
+
+
+def load_histograms():
+    return _load_histograms(dataset_signature())
+
+# Amostra estratificada por Churn usada nos gráficos de densidade do modo aproximado
+@st.cache_resource(max_entries=DATA_CACHE_MAX_ENTRIES, ttl=DATA_CACHE_TTL)
+def _load_sample(signature, size_per_class):
+    return stratified_sample(load_data(), size_per_class)
+
+
+def load_sample(size_per_class):
+    return _load_sample(dataset_signature(), size_per_class)
+
+# Versão do dataset (hash do conteúdo): parte da chave do cache de figuras
+@st.cache_data(max_entries=DATA_CACHE_MAX_ENTRIES, ttl=DATA_CACHE_TTL)
+def _dataset_version(path, signature):
+    return file_hash(path)
+
+
+def dataset_version():
+    return _dataset_version(DATASET_PATH, dataset_signature())
+
+# Número máximo de figuras (PNG) mantidas em memória, somando todas as sessões
+FIGURE_STORE_MAX_ENTRIES = 64
+
+
+class FigureStore:
+    """Figuras já renderizadas por (versão do dataset, id do gráfico), com limite LRU
+
+    Compartilhada entre as sessões, que rodam em threads próprias: todo acesso passa pelo lock.
+    """
+
+    def __init__(self, max_entries=FIGURE_STORE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            png = self._entries.get(key)
+            if png is not None:
+                self._entries.move_to_end(key)
+            return png
+
+    def put(self, key, png):
+        with self._lock:
+            # Figuras de versões anteriores do dataset são descartadas
+            for stale in [cached for cached in self._entries if cached[0] != key[0]]:
+                del self._entries[stale]
+            self._entries[key] = png
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+@st.cache_resource
+def figure_store():
+    return FigureStore()
 
+
+def show_figure(chart_id, draw):
+    """Exibe a figura do cache (versão do dataset, id do gráfico), desenhando-a só na primeira vez"""
+    store = figure_store()
+    key = (dataset_version(), chart_id)
+    png = store.get(key)
+    if png is None:
+        fig = draw()
+        buffer = BytesIO()
+        fig.savefig(buffer, format='png', bbox_inches='tight')
+        plt.close(fig)
+        png = buffer.getvalue()
+        store.put(key, png)
+    st.image(png)
+
+
+def draw_churn_percent(cube, col, palette, title, rotate=False):
+    """Barras de percentual de Churn por categoria"""
+    fig, ax = plt.subplots()
+    sns.barplot(x=col, y='percent', hue='Churn', data=churn_percent(cube, col), palette=palette, ax=ax)
+    ax.set_title(title)
+    if rotate:
+        ax.tick_params(axis='x', labelrotation=45)
+    return fig
+
+
+def draw_churn_proportions(cube, col, title, xlabel):
+    """Barras empilhadas da proporção de Churn por categoria"""
+    fig, ax = plt.subplots(figsize=(6,4))
+    churn_proportions(cube, col).plot(kind='bar', stacked=True, color=['green', 'red'], ax=ax)
+    ax.set_title(title)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel('Proporção')
+    ax.legend(title='Churn', loc='upper right')
+    return fig
+
+
+# Seções do relatório
+def section_overview(data, cube):
     # Visão Geral dos Dados
     st.header("Visão Geral dos Dados")
     st.write("A base de dados contém informações de {} clientes.".format(data.shape[0]))
@@ -37,15 +183,21 @@ def main():
 
     # Distribuição da Variável Alvo (Churn)
     st.subheader("Distribuição do Churn")
-    fig1, ax1 = plt.subplots()
-    churn_counts = data['Churn'].value_counts(normalize=True) * 100
-    sns.barplot(x=churn_counts.index, y=churn_counts.values, palette='viridis', ax=ax1)
-    ax1.set_ylabel('Percentual')
-    ax1.set_title('Percentual de Clientes que Realizaram Churn')
-    for i, v in enumerate(churn_counts.values):
-        ax1.text(i, v + 1, f"{v:.2f}%", ha='center')
-    st.pyplot(fig1)
 
+    def draw():
+        fig1, ax1 = plt.subplots()
+        churn_counts = churn_distribution(cube)
+        sns.barplot(x=churn_counts.index, y=churn_counts.values, palette='viridis', ax=ax1)
+        ax1.set_ylabel('Percentual')
+        ax1.set_title('Percentual de Clientes que Realizaram Churn')
+        for i, v in enumerate(churn_counts.values):
+            ax1.text(i, v + 1, f"{v:.2f}%", ha='center')
+        return fig1
+
+    show_figure('churn_distribution', draw)
+
+
+def section_demographics(data, cube):
     # Análise Demográfica
     st.header("Análise Demográfica")
 
@@ -55,29 +207,17 @@ def main():
     # Gênero
     with col1:
         st.subheader("Gênero")
-        gender_churn = data.groupby('gender')['Churn'].value_counts(normalize=True).mul(100).rename('percent').reset_index()
-        fig2, ax2 = plt.subplots()
-        sns.barplot(x='gender', y='percent', hue='Churn', data=gender_churn, palette='pastel', ax=ax2)
-        ax2.set_title('Churn por Gênero (%)')
-        st.pyplot(fig2)
+        show_figure('churn_gender', lambda: draw_churn_percent(cube, 'gender', 'pastel', 'Churn por Gênero (%)'))
 
     # Senior Citizen
     with col2:
         st.subheader("Idosos (Senior Citizens)")
-        senior_churn = data.groupby('SeniorCitizen')['Churn'].value_counts(normalize=True).mul(100).rename('percent').reset_index()
-        fig3, ax3 = plt.subplots()
-        sns.barplot(x='SeniorCitizen', y='percent', hue='Churn', data=senior_churn, palette='Set2', ax=ax3)
-        ax3.set_title('Churn por Idosos (%)')
-        st.pyplot(fig3)
+        show_figure('churn_senior', lambda: draw_churn_percent(cube, 'SeniorCitizen', 'Set2', 'Churn por Idosos (%)'))
 
     # Dependentes
     with col3:
         st.subheader("Dependentes")
-        dependents_churn = data.groupby('Dependents')['Churn'].value_counts(normalize=True).mul(100).rename('percent').reset_index()
-        fig4, ax4 = plt.subplots()
-        sns.barplot(x='Dependents', y='percent', hue='Churn', data=dependents_churn, palette='coolwarm', ax=ax4)
-        ax4.set_title('Churn por Dependentes (%)')
-        st.pyplot(fig4)
+        show_figure('churn_dependents', lambda: draw_churn_percent(cube, 'Dependents', 'coolwarm', 'Churn por Dependentes (%)'))
 
     st.markdown("""
     **Observações:**
@@ -86,6 +226,8 @@ def main():
     - **Dependentes:** Clientes sem dependentes tendem a cancelar mais os serviços.
     """)
 
+
+def section_services(data, cube):
     # Análise dos Serviços
     st.header("Análise dos Serviços")
 
@@ -94,32 +236,20 @@ def main():
     # Internet Service
     with col4:
         st.subheader("Tipo de Internet")
-        internet_churn = data.groupby('InternetService')['Churn'].value_counts(normalize=True).mul(100).rename('percent').reset_index()
-        fig5, ax5 = plt.subplots()
-        sns.barplot(x='InternetService', y='percent', hue='Churn', data=internet_churn, palette='Accent', ax=ax5)
-        ax5.set_title('Churn por Tipo de Internet (%)')
-        plt.xticks(rotation=45)
-        st.pyplot(fig5)
+        show_figure('churn_internet', lambda: draw_churn_percent(
+            cube, 'InternetService', 'Accent', 'Churn por Tipo de Internet (%)', rotate=True))
 
     # Contract Type
     with col5:
         st.subheader("Tipo de Contrato")
-        contract_churn = data.groupby('Contract')['Churn'].value_counts(normalize=True).mul(100).rename('percent').reset_index()
-        fig6, ax6 = plt.subplots()
-        sns.barplot(x='Contract', y='percent', hue='Churn', data=contract_churn, palette='Dark2', ax=ax6)
-        ax6.set_title('Churn por Tipo de Contrato (%)')
-        plt.xticks(rotation=45)
-        st.pyplot(fig6)
+        show_figure('churn_contract', lambda: draw_churn_percent(
+            cube, 'Contract', 'Dark2', 'Churn por Tipo de Contrato (%)', rotate=True))
 
     # Payment Method
     with col6:
         st.subheader("Método de Pagamento")
-        payment_churn = data.groupby('PaymentMethod')['Churn'].value_counts(normalize=True).mul(100).rename('percent').reset_index()
-        fig7, ax7 = plt.subplots()
-        sns.barplot(x='PaymentMethod', y='percent', hue='Churn', data=payment_churn, palette='Set1', ax=ax7)
-        ax7.set_title('Churn por Método de Pagamento (%)')
-        plt.xticks(rotation=45)
-        st.pyplot(fig7)
+        show_figure('churn_payment', lambda: draw_churn_percent(
+            cube, 'PaymentMethod', 'Set1', 'Churn por Método de Pagamento (%)', rotate=True))
 
     st.markdown("""
     **Observações:**
@@ -128,31 +258,66 @@ def main():
     - **Método de Pagamento:** Clientes que pagam com débito automático têm menor churn.
     """)
 
+
+def section_financial(data, cube):
     # Análise Financeira
     st.header("Análise Financeira")
 
-    # Distribuição dos Charges
-    fig8, ax8 = plt.subplots(figsize=(10, 6))
-    sns.kdeplot(data[data['Churn'] == 'No']['MonthlyCharges'], label='Não Churn', shade=True)
-    sns.kdeplot(data[data['Churn'] == 'Yes']['MonthlyCharges'], label='Churn', shade=True)
-    ax8.set_title('Distribuição de Cobranças Mensais')
-    ax8.set_xlabel('Cobrança Mensal')
-    ax8.legend()
-    st.pyplot(fig8)
+    # Distribuição dos Charges: no modo aproximado, a densidade é estimada em uma amostra
+    # estratificada por Churn e o histograma exato (pré-calculado) é exibido ao fundo
+    approximate = st.session_state.get('approximate', False)
+    sample_size = st.session_state.get('sample_size', DEFAULT_SAMPLE_SIZE)
+    density_data = load_sample(sample_size) if approximate else data
+
+    def draw():
+        fig8, ax8 = plt.subplots(figsize=(10, 6))
+        if approximate:
+            edges, counts = load_histograms()['MonthlyCharges']
+            for churn, color in (('No', 'C0'), ('Yes', 'C1')):
+                density = counts[churn] / (counts[churn].sum() * np.diff(edges))
+                ax8.stairs(density, edges, color=color, alpha=0.4)
+        sns.kdeplot(density_data[density_data['Churn'] == 'No']['MonthlyCharges'], label='Não Churn', fill=True, ax=ax8)
+        sns.kdeplot(density_data[density_data['Churn'] == 'Yes']['MonthlyCharges'], label='Churn', fill=True, ax=ax8)
+        ax8.set_title('Distribuição de Cobranças Mensais')
+        ax8.set_xlabel('Cobrança Mensal')
+        ax8.legend()
+        return fig8
+
+    show_figure('monthly_charges_kde_sample{}'.format(sample_size) if approximate else 'monthly_charges_kde', draw)
+
+    if approximate:
+        class_sizes = density_data['Churn'].value_counts()
+        st.caption("Amostra estratificada: {} clientes sem churn e {} com churn, de {} no total. "
+                   "Erro máximo da distribuição acumulada (DKW, 95%): ±{:.3f} / ±{:.3f}.".format(
+                       class_sizes['No'], class_sizes['Yes'], len(data),
+                       dkw_bound(class_sizes['No']), dkw_bound(class_sizes['Yes'])))
 
     st.markdown("""
     **Observações:**
     - Clientes que realizam churn tendem a ter cobranças mensais mais altas.
     """)
 
+
+def section_tenure(data, cube):
     # Análise do Tempo de Permanência (Tenure)
     st.header("Tempo de Permanência e Churn")
 
-    fig9, ax9 = plt.subplots(figsize=(10, 6))
-    sns.histplot(data=data, x='tenure', hue='Churn', multiple='stack', bins=30, palette='muted', ax=ax9)
-    ax9.set_title('Distribuição do Tempo de Permanência')
-    ax9.set_xlabel('Meses com a Empresa')
-    st.pyplot(fig9)
+    # Histograma empilhado a partir das contagens exatas pré-calculadas (sem percorrer as linhas)
+    def draw():
+        edges, counts = load_histograms()['tenure']
+        fig9, ax9 = plt.subplots(figsize=(10, 6))
+        bottom = np.zeros(len(counts))
+        for churn, color in zip(counts.columns, sns.color_palette('muted')):
+            ax9.bar(edges[:-1], counts[churn], width=np.diff(edges), align='edge', bottom=bottom,
+                    color=color, edgecolor='white', label=churn)
+            bottom += counts[churn].to_numpy()
+        ax9.legend(title='Churn')
+        ax9.set_title('Distribuição do Tempo de Permanência')
+        ax9.set_xlabel('Meses com a Empresa')
+        ax9.set_ylabel('Count')
+        return fig9
+
+    show_figure('tenure_histogram', draw)
 
     st.markdown("""
     **Observações:**
@@ -160,45 +325,52 @@ def main():
     - Estratégias de retenção devem focar nos clientes novos.
     """)
 
+
+def section_payment(data, cube):
     # Análise de Métodos de Pagamento
-    st.markdown("---")
     st.header("Análise de Métodos de Pagamento")
 
     col1, col2 = st.columns(2)
+    payment_counts = cube['PaymentMethod'].sum(axis=1).sort_values(ascending=False)
 
     with col1:
         # Distribuição dos Métodos de Pagamento
         st.subheader("Distribuição dos Métodos de Pagamento")
-        payment_counts = data['PaymentMethod'].value_counts()
-        plt.figure(figsize=(8,6))
-        ax = sns.countplot(y='PaymentMethod', data=data, palette='Set2', order=payment_counts.index)
-        plt.title('Contagem dos Métodos de Pagamento')
-        plt.xlabel('Contagem')
-        plt.ylabel('Método de Pagamento')
-
-        # Adicionar labels nas barras
-        for p in ax.patches:
-            width = p.get_width()
-            plt.text(width + 1, p.get_y() + p.get_height()/2, int(width), va='center')
-
-        st.pyplot(plt)
+
+        def draw_counts():
+            fig, ax = plt.subplots(figsize=(8,6))
+            sns.barplot(x=payment_counts.values, y=payment_counts.index, palette='Set2', order=payment_counts.index, ax=ax)
+            ax.set_title('Contagem dos Métodos de Pagamento')
+            ax.set_xlabel('Contagem')
+            ax.set_ylabel('Método de Pagamento')
+
+            # Adicionar labels nas barras
+            for p in ax.patches:
+                width = p.get_width()
+                ax.text(width + 1, p.get_y() + p.get_height()/2, int(width), va='center')
+            return fig
+
+        show_figure('payment_counts', draw_counts)
         st.write(f"Distribuição dos Métodos de Pagamento:\n{payment_counts}")
 
     with col2:
         # Churn por Método de Pagamento
         st.subheader("Churn por Método de Pagamento")
-        payment_churn = data.groupby('PaymentMethod')['Churn'].value_counts(normalize=True).unstack()
-        ax = payment_churn.plot(kind='barh', stacked=True, figsize=(8,6), color=['green', 'red'])
-        plt.title('Proporção de Churn por Método de Pagamento')
-        plt.xlabel('Proporção')
-        plt.ylabel('Método de Pagamento')
-        plt.legend(title='Churn', loc='lower right')
-
-        # Adicionar labels nas barras
-        for container in ax.containers:
-            ax.bar_label(container, fmt='%.2f', label_type='center')
-
-        st.pyplot(plt)
+
+        def draw_churn():
+            fig, ax = plt.subplots(figsize=(8,6))
+            churn_proportions(cube, 'PaymentMethod').plot(kind='barh', stacked=True, color=['green', 'red'], ax=ax)
+            ax.set_title('Proporção de Churn por Método de Pagamento')
+            ax.set_xlabel('Proporção')
+            ax.set_ylabel('Método de Pagamento')
+            ax.legend(title='Churn', loc='lower right')
+
+            # Adicionar labels nas barras
+            for container in ax.containers:
+                ax.bar_label(container, fmt='%.2f', label_type='center')
+            return fig
+
+        show_figure('payment_churn_proportions', draw_churn)
         st.write("""
         Observamos que clientes que utilizam **Pagamento Eletrônico** (Electronic Check) têm uma taxa de churn significativamente maior. Métodos automatizados, como débito em conta bancária e cartão de crédito, apresentam taxas de churn menores.
         """)
@@ -206,33 +378,21 @@ def main():
 
     # Análise de Faturamento Sem Papel (PaperlessBilling)
     st.subheader("Churn por Faturamento Sem Papel")
-    paperless_churn = data.groupby('PaperlessBilling')['Churn'].value_counts(normalize=True).unstack()
-    paperless_churn.plot(kind='bar', stacked=True, figsize=(6,4), color=['green', 'red'])
-    plt.title('Proporção de Churn por Faturamento Sem Papel')
-    plt.xlabel('Faturamento Sem Papel')
-    plt.ylabel('Proporção')
-    plt.legend(title='Churn', loc='upper right')
-    st.pyplot(plt)
+    show_figure('paperless_churn_proportions', lambda: draw_churn_proportions(
+        cube, 'PaperlessBilling', 'Proporção de Churn por Faturamento Sem Papel', 'Faturamento Sem Papel'))
     st.write("""
     Clientes que optam pelo **Faturamento Sem Papel** têm uma taxa de churn mais alta. Isso pode estar relacionado ao perfil desses clientes ou à forma como recebem e entendem suas cobranças.
     """)
 
+
+def section_additional_services(data, cube):
     # Análise de Serviços Adicionais
-    st.markdown("---")
     st.header("Análise de Serviços Adicionais")
 
-    # Listar serviços adicionais
-    additional_services = ['PhoneService', 'MultipleLines', 'OnlineSecurity', 'OnlineBackup', 'DeviceProtection', 'TechSupport', 'StreamingTV', 'StreamingMovies']
-
-    for service in additional_services:
+    for service in ADDITIONAL_SERVICES:
         st.subheader(f"Churn por {service}")
-        service_churn = data.groupby(service)['Churn'].value_counts(normalize=True).unstack()
-        service_churn.plot(kind='bar', stacked=True, figsize=(6,4), color=['green', 'red'])
-        plt.title(f'Proporção de Churn por {service}')
-        plt.xlabel(service)
-        plt.ylabel('Proporção')
-        plt.legend(title='Churn', loc='upper right')
-        st.pyplot(plt)
+        show_figure(f'service_churn_{service}', lambda: draw_churn_proportions(
+            cube, service, f'Proporção de Churn por {service}', service))
         st.write(f"""
         Analisando o serviço **{service}**, podemos observar:
         """)
@@ -247,36 +407,34 @@ def main():
             """)
         # Adicionar mais comentários conforme necessário
 
+
+def section_partner(data, cube):
     # Análise de Parceiros (Partner)
-    st.markdown("---")
     st.header("Análise de Parceria")
 
     st.subheader("Churn por Parceiros")
-    partner_churn = data.groupby('Partner')['Churn'].value_counts(normalize=True).unstack()
-    partner_churn.plot(kind='bar', stacked=True, figsize=(6,4), color=['green', 'red'])
-    plt.title('Proporção de Churn por Parceiros')
-    plt.xlabel('Possui Parceiro')
-    plt.ylabel('Proporção')
-    plt.legend(title='Churn', loc='upper right')
-    st.pyplot(plt)
+    show_figure('partner_churn_proportions', lambda: draw_churn_proportions(
+        cube, 'Partner', 'Proporção de Churn por Parceiros', 'Possui Parceiro'))
     st.write("""
     Clientes que **não possuem parceiro** têm uma taxa de churn maior. Isso pode indicar que pessoas em relacionamentos comprometidos são mais estáveis em suas escolhas de serviços.
     """)
 
 
-
+def section_correlation(data, cube):
     # Correlação entre Variáveis Numéricas
     st.header("Correlação entre Variáveis Numéricas")
 
-    num_vars = ['tenure', 'MonthlyCharges', 'TotalCharges']
-    corr_data = data[num_vars]
-    corr_data['TotalCharges'] = pd.to_numeric(corr_data['TotalCharges'], errors='coerce')
-    corr = corr_data.corr()
+    def draw():
+        # 'TotalCharges' já chega numérica do carregamento; nada é alterado no frame em cache
+        num_vars = ['tenure', 'MonthlyCharges', 'TotalCharges']
+        corr = data[num_vars].corr()
+
+        fig10, ax10 = plt.subplots()
+        sns.heatmap(corr, annot=True, cmap='Blues', ax=ax10)
+        ax10.set_title('Matriz de Correlação')
+        return fig10
 
-    fig10, ax10 = plt.subplots()
-    sns.heatmap(corr, annot=True, cmap='Blues', ax=ax10)
-    ax10.set_title('Matriz de Correlação')
-    st.pyplot(fig10)
+    show_figure('numeric_correlation', draw)
 
     st.markdown("""
     **Observações:**
@@ -284,6 +442,8 @@ def main():
     - `MonthlyCharges` tem correlação baixa com `tenure`, indicando que clientes novos podem ter cobranças similares aos antigos.
     """)
 
+
+def section_conclusions(data, cube):
     # Conclusões Gerais
     st.header("Conclusões Gerais")
     st.markdown("""
@@ -301,5 +461,57 @@ def main():
     - Avaliar ofertas especiais para clientes com cobranças mensais altas.
     """)
 
+
+SECTIONS = {
+    "Visão Geral": section_overview,
+    "Demografia": section_demographics,
+    "Serviços": section_services,
+    "Financeiro": section_financial,
+    "Tempo de Permanência": section_tenure,
+    "Métodos de Pagamento": section_payment,
+    "Serviços Adicionais": section_additional_services,
+    "Parceria": section_partner,
+    "Correlação": section_correlation,
+    "Conclusões": section_conclusions,
+}
+
+
+def timed(name, fn, *args):
+    """Executa fn registrando o tempo de renderização no painel de debug"""
+    start = time.perf_counter()
+    result = fn(*args)
+    st.session_state.setdefault('render_times', {})[name] = time.perf_counter() - start
+    return result
+
+
+# Função principal do Streamlit
+def main():
+    # Título e Introdução
+    st.title("Análise Exploratória: Telco Customer Churn")
+    st.markdown("""
+    **Contexto:** Esta análise explora dados de clientes de uma empresa de telecomunicações,
+    buscando entender os fatores que influenciam o cancelamento de serviços (*churn*).
+    Vamos investigar como diferentes características dos clientes estão relacionadas ao churn.
+    """)
+
+    # Carregar os dados
+    data = timed("Carregamento dos dados", load_data)
+    cube = timed("Agregação (cubo)", load_churn_cube)
+
+    # Modo aproximado para os gráficos de densidade em bases grandes
+    approximate = st.sidebar.checkbox("Modo aproximado (amostragem)", value=len(data) > APPROX_THRESHOLD,
+                                      key='approximate')
+    st.sidebar.number_input("Amostra por classe de Churn", min_value=500, value=DEFAULT_SAMPLE_SIZE, step=500,
+                            key='sample_size', disabled=not approximate)
+
+    # Apenas a seção escolhida é executada; as demais não custam nada na reexecução
+    section = st.sidebar.radio("Seção", list(SECTIONS))
+    timed(section, SECTIONS[section], data, cube)
+
+    # Painel de debug: último tempo de renderização de cada etapa/seção
+    if st.sidebar.checkbox("Debug: tempos de renderização"):
+        render_times = pd.Series(st.session_state.get('render_times', {}), name='segundos')
+        st.sidebar.dataframe(render_times.round(3))
+
 if __name__ == '__main__':
     main()